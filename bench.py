@@ -0,0 +1,238 @@
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pygame
+
+import game as game_module
+from bullet_pool import BulletPool
+from constants import *
+from game import Game
+
+PHASES = [
+    "star_update",
+    "center_zoom",
+    "gravity",
+    "swarms",
+    "bullet_update",
+    "collisions",
+    "render_sort",
+    "draw_stars",
+    "draw_bullets",
+    "draw_swarms",
+    "draw_spaceship",
+    "present",
+]
+
+DEFAULT_STAR_COUNTS = [100, 1000, 10000, 100000, 1000000]
+DEFAULT_BULLET_COUNTS = [0, 1000, 4000]
+
+class PhaseTimer:
+    """Accumulates wall time per phase for the current frame."""
+
+    def __init__(self):
+        self.current = dict.fromkeys(PHASES, 0.0)
+
+    def wrap(self, phase, function):
+        """Return function instrumented to add its run time to phase."""
+        current = self.current
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            result = function(*args, **kwargs)
+            current[phase] += time.perf_counter() - start
+            return result
+        return timed
+
+    def reset(self):
+        for phase in self.current:
+            self.current[phase] = 0.0
+
+def instrument(game, timer):
+    """Wrap the hot-loop entry points of a Game so each phase is timed separately."""
+    game.stars.update = timer.wrap("star_update", game.stars.update)
+    game.center_zoom = timer.wrap("center_zoom", game.center_zoom)
+    game.apply_gravity = timer.wrap("gravity", game.apply_gravity)
+    game.update_swarms = timer.wrap("swarms", game.update_swarms)
+    game.bullets.update = timer.wrap("bullet_update", game.bullets.update)
+    game.collide_bullets = timer.wrap("collisions", game.collide_bullets)
+    game.render_queue.sort = timer.wrap("render_sort", game.render_queue.sort)
+    game.backend.draw_stars = timer.wrap("draw_stars", game.backend.draw_stars)
+    game.bullets.draw = timer.wrap("draw_bullets", game.bullets.draw)
+    for swarm in game.swarms:
+        swarm.draw = timer.wrap("draw_swarms", swarm.draw)
+    game_module.draw_spaceship = timer.wrap("draw_spaceship", game_module.draw_spaceship)
+
+def refill_bullets(pool, count, rng):
+    """Top the pool back up to count live bullets with random headings and kinds."""
+    directions = list(DIRECTION_VECTORS)
+    missing = count - len(pool)
+    if missing <= 0:
+        return
+    positions = rng.uniform((0, 0), (WIDTH, HEIGHT), (missing, 2))
+    headings = rng.integers(0, len(directions), missing)
+    kinds = rng.integers(BULLET_NEUTRAL, BULLET_OUTWARD + 1, missing)
+    for position, heading, kind in zip(positions, headings.tolist(), kinds.tolist()):
+        pool.spawn(position, directions[heading], kind, 1.0, 35, 30)
+
+def summarize(samples):
+    """p50/p95/p99/mean of a list of durations in seconds, reported in milliseconds."""
+    values = np.asarray(samples) * 1000.0
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"p50": p50, "p95": p95, "p99": p99, "mean": values.mean()}
+
+def run_case(num_stars, num_bullets, frames, warmup, seed, target, dirty_rects=False, gravity=False,
+             swarms=0, swarm_size=SWARM_SIZE):
+    """
+    Time a headless Game for a given star and bullet count.
+    Returns:
+        dict: Frame and per-phase percentiles in milliseconds.
+    """
+    original_draw_spaceship = game_module.draw_spaceship
+    game = Game(headless=True, seed=seed, num_stars=num_stars, dirty_rects=dirty_rects,
+                gravity=gravity, swarms=swarms, swarm_size=swarm_size)
+    game.bullets = BulletPool(max(BULLET_POOL_CAPACITY, num_bullets))
+    if target and num_stars:
+        game.target_star = game.stars[0]
+    timer = PhaseTimer()
+    instrument(game, timer)
+    present = timer.wrap("present", game.present)
+    rng = np.random.default_rng(seed)
+
+    frame_times = []
+    phase_times = {phase: [] for phase in PHASES}
+    materialized = []
+    try:
+        for frame in range(warmup + frames):
+            refill_bullets(game.bullets, num_bullets, rng)
+            timer.reset()
+            start = time.perf_counter()
+            game.step(game.simulation_step)
+            game.draw()
+            present()
+            elapsed = time.perf_counter() - start
+            if frame >= warmup:
+                frame_times.append(elapsed)
+                materialized.append(len(game.stars))
+                for phase, value in timer.current.items():
+                    phase_times[phase].append(value)
+    finally:
+        game.close()
+        game_module.draw_spaceship = original_draw_spaceship
+
+    return {
+        "stars": num_stars,
+        "materialized": int(np.median(materialized)) if materialized else 0,  # Stars the field simulated
+        "bullets": num_bullets,
+        "frames": frames,
+        "frame_ms": summarize(frame_times),
+        "phases_ms": {phase: summarize(values) for phase, values in phase_times.items()},
+    }
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline, tolerance):
+    """
+    List phases whose p50 got slower than the baseline by more than tolerance.
+    Returns:
+        list of str: One line per regression.
+    """
+    previous = {(case["stars"], case["bullets"]): case for case in baseline["results"]}
+    regressions = []
+    for case in results:
+        old = previous.get((case["stars"], case["bullets"]))
+        if old is None:
+            continue
+        pairs = [("frame", case["frame_ms"], old["frame_ms"])]
+        pairs += [(phase, case["phases_ms"][phase], old["phases_ms"].get(phase)) for phase in PHASES]
+        for name, new_stats, old_stats in pairs:
+            if not old_stats or old_stats["p50"] <= 0:
+                continue
+            ratio = new_stats["p50"] / old_stats["p50"]
+            if ratio > 1.0 + tolerance:
+                regressions.append(
+                    f"stars={case['stars']} bullets={case['bullets']} {name}: "
+                    f"p50 {old_stats['p50']:.3f} -> {new_stats['p50']:.3f} ms ({ratio:.2f}x)"
+                )
+    return regressions
+
+def parse_counts(text):
+    return [int(value) for value in text.split(",") if value]
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Frame-time benchmark for the Game.run hot loop")
+    parser.add_argument("--stars", type=parse_counts, default=DEFAULT_STAR_COUNTS,
+                        help="comma separated NUM_STARS values to sweep: average stars on screen, while "
+                             "about 2-2.5x as many are simulated (each case reports its materialized count)")
+    parser.add_argument("--bullets", type=parse_counts, default=DEFAULT_BULLET_COUNTS,
+                        help="comma separated live bullet counts to sweep")
+    parser.add_argument("--frames", type=int, default=60, help="measured frames per case")
+    parser.add_argument("--warmup", type=int, default=5, help="unmeasured frames before each case")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-target", dest="target", action="store_false",
+                        help="do not target a star, which skips the center_zoom pass")
+    parser.add_argument("--dirty-rects", action="store_true", help="present through the dirty-rect path")
+    parser.add_argument("--gravity", action="store_true", help="simulate star gravity")
+    parser.add_argument("--swarms", type=int, default=0, help="NPC ship swarms chasing the ship")
+    parser.add_argument("--swarm-size", type=int, default=SWARM_SIZE, help="ships per swarm")
+    parser.add_argument("--output", default="bench_results.json", help="where to write the JSON report")
+    parser.add_argument("--baseline", help="earlier JSON report to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.10,
+                        help="allowed p50 slowdown against the baseline, as a fraction")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = []
+    print(f"{'stars':>8} {'bullets':>8} {'p50':>9} {'p95':>9} {'p99':>9}  slowest phase")
+    for num_stars in args.stars:
+        for num_bullets in args.bullets:
+            case = run_case(num_stars, num_bullets, args.frames, args.warmup, args.seed, args.target,
+                            args.dirty_rects, args.gravity, args.swarms, args.swarm_size)
+            results.append(case)
+            frame = case["frame_ms"]
+            slowest = max(PHASES, key=lambda phase: case["phases_ms"][phase]["p50"])
+            print(f"{num_stars:>8} {num_bullets:>8} {frame['p50']:>8.2f}ms {frame['p95']:>8.2f}ms "
+                  f"{frame['p99']:>8.2f}ms  {slowest} ({case['phases_ms'][slowest]['p50']:.2f}ms)")
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "numpy": np.__version__,
+            "seed": args.seed,
+            "frames": args.frames,
+            "warmup": args.warmup,
+            "target": args.target,
+            "dirty_rects": args.dirty_rects,
+            "gravity": args.gravity,
+            "swarms": args.swarms,
+            "swarm_size": args.swarm_size,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"wrote {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for line in regressions:
+            print("REGRESSION", line)
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+import numpy as np
+from constants import *
+from utils import interpolate_positions
+from topology import wrap_points
+
+# Per-kind tuning, indexed by BULLET_NEUTRAL / BULLET_INWARD / BULLET_OUTWARD
+KIND_SPEED_MODS = np.array([NEUTRAL_BULLET_SPEED_MOD, INWARD_BULLET_SPEED_MOD, OUTWARD_BULLET_SPEED_MOD])
+KIND_DEPTH_CHANGES = np.array([0.0, 0.25, -0.25])
+KIND_VELOCITY_SCALES = np.array([1.0, 0.25, 0.25])
+KIND_LIFESPANS = np.array([2.0, 1.0, 1.0])  # Seconds
+
+BULLET_BASE_SPEED = 200
+
+def bullet_kind(direction):
+    """Map a ship direction string such as "up_inward" to an integer bullet kind."""
+    if "inward" in direction:
+        return BULLET_INWARD
+    if "outward" in direction:
+        return BULLET_OUTWARD
+    return BULLET_NEUTRAL
+
+class BulletPool:
+    def __init__(self, capacity=BULLET_POOL_CAPACITY):
+        """
+        Preallocate array-backed storage for a fixed number of bullets.
+        Args:
+            capacity (int): Maximum number of live bullets.
+        """
+        self.capacity = capacity
+        self.positions = np.zeros((capacity, 2))
+        self.previous_positions = np.zeros((capacity, 2))  # Positions at the start of the tick
+        self.velocities = np.zeros((capacity, 2))
+        self.depths = np.ones(capacity)
+        self.depth_changes = np.zeros(capacity)
+        self.base_sizes = np.ones(capacity, dtype=np.int32)
+        self.kinds = np.zeros(capacity, dtype=np.int8)
+        self.lifespans = np.zeros(capacity)  # Seconds left to live
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.free = list(range(capacity - 1, -1, -1))
+
+    def __len__(self):
+        return self.capacity - len(self.free)
+
+    def spawn(self, position, direction, kind, depth, spaceship_width, spaceship_height):
+        """
+        Claim a free slot for a new bullet.
+        Args:
+            position (Vector2): Where the bullet starts.
+            direction (str): Base facing such as "up" or "down-left".
+            kind (int): One of BULLET_NEUTRAL, BULLET_INWARD or BULLET_OUTWARD.
+            depth (float): The depth the bullet is fired from.
+            spaceship_width (int): Width of the firing ship in pixels.
+            spaceship_height (int): Height of the firing ship in pixels.
+        Returns:
+            int or None: The slot index, or None if the pool is exhausted.
+        """
+        if not self.free:
+            return None
+        index = self.free.pop()
+
+        direction_vector = DIRECTION_VECTORS.get(direction, (0, -1))
+        velocity_scale = BULLET_BASE_SPEED * KIND_VELOCITY_SCALES[kind]
+
+        self.positions[index] = (position[0], position[1])
+        self.previous_positions[index] = self.positions[index]
+        self.velocities[index] = (direction_vector[0] * velocity_scale, direction_vector[1] * velocity_scale)
+        self.depths[index] = depth
+        self.depth_changes[index] = KIND_DEPTH_CHANGES[kind]
+        self.base_sizes[index] = max(1, int(min(spaceship_width, spaceship_height) / (2 * depth)))
+        self.kinds[index] = kind
+        self.lifespans[index] = KIND_LIFESPANS[kind]
+        self.alive[index] = True
+        return index
+
+    def store_previous_positions(self):
+        """Remember where the bullets are at the start of a simulation tick."""
+        np.copyto(self.previous_positions, self.positions)
+
+    def interpolated_positions(self, alpha):
+        """Bullet positions a fraction alpha of the way through the current tick."""
+        if alpha >= 1.0:
+            return self.positions
+        return interpolate_positions(self.previous_positions, self.positions, alpha)
+
+    def update(self, delta_time):
+        """
+        Age, move and wrap every live bullet in one batched pass, then recycle the dead.
+        Args:
+            delta_time (float): The delta time between frames.
+        """
+        alive = self.alive
+        self.lifespans -= delta_time
+        expired = alive & (self.lifespans < 0)
+
+        self.depths += self.depth_changes * delta_time
+
+        # If the bullet has gone out of the depth range, mark it as inactive
+        out_of_range = alive & ((self.depths < MIN_DEPTH) | (self.depths > BULLET_MAX_DEPTH))
+        dead = expired | out_of_range
+        alive &= ~dead
+        self.depth_changes[dead] = 0.0
+
+        # **Bullet Speed Adjustment by Type**
+        speed = KIND_SPEED_MODS[self.kinds] * delta_time
+        outward = self.kinds == BULLET_OUTWARD
+        speed[outward] *= np.maximum(1e-6, 2.0 / self.depths[outward])
+        speed[~alive] = 0.0
+        self.positions += self.velocities * speed[:, None]
+
+        # **Inverse Toroidal Wrapping for Bullets**
+        wrap_points(self.positions)
+
+        if dead.any():
+            self.free.extend(np.flatnonzero(dead).tolist())
+
+    def kill(self, indices):
+        """
+        Retire bullets before their time, e.g. on impact, and return their slots to the pool.
+        Args:
+            indices (numpy.ndarray): Slots of live bullets.
+        """
+        self.alive[indices] = False
+        self.depth_changes[indices] = 0.0
+        self.free.extend(np.asarray(indices).tolist())
+
+    def radii(self, indices):
+        """On-screen radius of the given bullets, shrinking with depth."""
+        return np.maximum(1, (self.base_sizes[indices] / self.depths[indices] ** 3.14).astype(np.int32)) // 2
+
+    def draw(self, target, indices, positions=None, scale=1.0):
+        """
+        Draw a set of bullets in the given order.
+        Args:
+            target (RenderBackend): What to draw through.
+            indices (numpy.ndarray): Slots to draw, back to front.
+            positions (numpy.ndarray, optional): Per-slot positions to draw at, e.g. interpolated ones.
+            scale (float): Render resolution relative to the logical screen.
+        """
+        depths = self.depths[indices]
+        dynamic_sizes = self.radii(indices)
+        color_factors = (depths - MIN_DEPTH) / (BULLET_MAX_DEPTH - MIN_DEPTH) * 3
+        colors = np.zeros((len(indices), 3), dtype=np.int32)
+        colors[:, 0] = 255 - 127 * color_factors
+        positions = self.positions if positions is None else positions
+        centers = positions[indices]
+        if scale != 1.0:
+            centers = centers * scale
+            dynamic_sizes = (dynamic_sizes * scale + 0.5).astype(np.int32)
+        target.draw_circles(centers.astype(np.int32), dynamic_sizes, colors)
@@ -0,0 +1,59 @@
+import numpy as np
+from constants import WIDTH, HEIGHT
+
+class Camera:
+    """
+    View transform from world positions to the screen: an offset, then a zoom about
+    the screen center. Moving the view only touches these few numbers; the transform
+    is applied to whole position arrays once, at render time.
+    """
+
+    def __init__(self, width=WIDTH, height=HEIGHT):
+        self.center = np.array([width / 2, height / 2])
+        self.offset = np.zeros(2)
+        self.previous_offset = np.zeros(2)  # Offset at the start of the simulation tick
+        self.zoom = 1.0
+
+    def store_previous_offset(self):
+        """Remember the offset at the start of a simulation tick."""
+        self.previous_offset[:] = self.offset
+
+    def move(self, displacement):
+        """Shift the view so the world appears moved by displacement on screen."""
+        self.offset += (displacement[0], displacement[1])
+
+    def interpolated_offset(self, alpha=1.0):
+        """The offset a fraction alpha of the way through the current tick."""
+        if alpha >= 1.0:
+            return self.offset
+        return self.previous_offset + (self.offset - self.previous_offset) * alpha
+
+    def to_view(self, positions, alpha=1.0):
+        """
+        Transform (N, 2) world positions to screen positions.
+        Args:
+            positions (numpy.ndarray): World positions.
+            alpha (float): Interpolation factor for the camera offset.
+        Returns:
+            numpy.ndarray: Screen positions; the input itself when the transform is the identity.
+        """
+        offset = self.interpolated_offset(alpha)
+        if self.zoom == 1.0:
+            if not offset.any():
+                return positions
+            return positions + offset
+        return self.center + (positions + offset - self.center) * self.zoom
+
+    def point_to_view(self, position):
+        """Transform a single world position to screen coordinates."""
+        return self.to_view(np.asarray(position, dtype=float)[None, :])[0]
+
+    def to_world(self, positions):
+        """Transform (N, 2) screen positions back to world coordinates."""
+        if self.zoom == 1.0:
+            return positions - self.offset
+        return (positions - self.center) / self.zoom + self.center - self.offset
+
+    def point_to_world(self, position):
+        """Transform a single screen position back to world coordinates."""
+        return self.to_world(np.asarray(position, dtype=float))
@@ -0,0 +1,82 @@
+import collections
+import cProfile
+import os
+import sys
+import threading
+import time
+
+from constants import CAPTURE_SECONDS, CAPTURE_SAMPLE_INTERVAL
+
+class ProfileCapture:
+    """
+    Profiles the calling thread for a fixed amount of time.
+    Two views are recorded at once: cProfile's deterministic per-function totals,
+    written as .pstats, and stacks sampled from a background thread, written in the
+    collapsed format flamegraph tools read ("outer;inner;leaf count" per line).
+    Files are written on a background thread so stopping doesn't stall a frame.
+    """
+
+    def __init__(self, path_prefix, seconds=CAPTURE_SECONDS, interval=CAPTURE_SAMPLE_INTERVAL):
+        """
+        Args:
+            path_prefix (str): Output path without extension; .pstats and .collapsed are appended.
+            seconds (float): How long to capture for.
+            interval (float): Seconds between stack samples.
+        """
+        self.pstats_path = path_prefix + ".pstats"
+        self.collapsed_path = path_prefix + ".collapsed"
+        self.seconds = seconds
+        self.interval = interval
+        self.profile = cProfile.Profile()
+        self.samples = collections.Counter()  # Tuple of code objects, outermost first -> hits
+        self.thread_id = None
+        self.started = None
+        self.stopped = threading.Event()
+        self.sampler = None
+        self.writer = None
+
+    def start(self):
+        """Begin profiling the calling thread."""
+        self.thread_id = threading.get_ident()
+        self.started = time.perf_counter()
+        self.sampler = threading.Thread(target=self._sample, name="profile-sampler", daemon=True)
+        self.sampler.start()
+        self.profile.enable()
+
+    def expired(self):
+        return self.started is not None and time.perf_counter() - self.started >= self.seconds
+
+    def stop(self):
+        """Stop profiling and write both files in the background."""
+        self.profile.disable()
+        self.stopped.set()
+        self.writer = threading.Thread(target=self._write, name="profile-writer")
+        self.writer.start()
+
+    def join(self):
+        """Wait until the output files are written."""
+        if self.writer is not None:
+            self.writer.join()
+
+    def _sample(self):
+        thread_id = self.thread_id
+        samples = self.samples
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            if stack:
+                samples[tuple(reversed(stack))] += 1
+
+    def _write(self):
+        self.sampler.join()
+        self.profile.dump_stats(self.pstats_path)
+        with open(self.collapsed_path, "w") as file:
+            for stack, hits in self.samples.items():
+                file.write(";".join(map(frame_label, stack)) + f" {hits}\n")
+
+def frame_label(code):
+    """Flamegraph label for a code object: function (file:line)."""
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
@@ -0,0 +1,24 @@
+class FixedClock:
+    """
+    Drop-in stand-in for pygame.time.Clock that advances by a fixed timestep.
+    Every tick reports the same frame time regardless of wall time, so runs driven
+    by it are reproducible.
+    """
+
+    def __init__(self, fps=60):
+        self.frame_time = 1000.0 / fps  # Milliseconds per tick
+        self.elapsed = 0.0
+
+    def tick(self, framerate=0):
+        """Advance one frame and return its duration in milliseconds; framerate is ignored."""
+        self.elapsed += self.frame_time
+        return self.frame_time
+
+    def get_time(self):
+        return self.frame_time
+
+    def get_ticks(self):
+        return self.elapsed
+
+    def get_fps(self):
+        return 1000.0 / self.frame_time
@@ -0,0 +1,61 @@
+import collections
+import math
+
+import numpy as np
+from constants import MIN_DEPTH, MAX_DEPTH, HIT_DEPTH_TOLERANCE
+
+# One bullet hitting one star during a tick
+Hit = collections.namedtuple("Hit", ["tick", "bullet", "kind", "star", "position", "depth"])
+
+def depth_layer_count(tolerance=HIT_DEPTH_TOLERANCE):
+    """Number of depth slabs, each tolerance deep, spanning the star depth range."""
+    return max(1, math.ceil((MAX_DEPTH - MIN_DEPTH) / tolerance))
+
+def depth_layers(depths, tolerance=HIT_DEPTH_TOLERANCE):
+    """Depth slab of each depth, for layering a SpatialGrid of stars."""
+    layers = ((depths - MIN_DEPTH) * (1.0 / tolerance)).astype(np.int32)
+    return np.clip(layers, 0, depth_layer_count(tolerance) - 1, out=layers)
+
+def find_hits(grid, star_depths, positions, radii, depths, tolerance=HIT_DEPTH_TOLERANCE, to_grid=None):
+    """
+    Match bullets against the stars indexed in a SpatialGrid.
+    The grid narrows each bullet down to stars in nearby cells and depth slabs, so the
+    cost grows with bullets + stars + close pairs rather than bullets * stars. A hit needs
+    the circles to overlap on screen and the depths to differ by at most tolerance. Stars
+    live on an unbounded plane rather than wrapping at the screen edges, so only a bullet's
+    own circle is queried.
+    Args:
+        grid (SpatialGrid): Stars with their radii, layered by depth_layers(depths, tolerance).
+        star_depths (numpy.ndarray): Depth of every star in the grid.
+        positions (numpy.ndarray): (M, 2) bullet positions on screen.
+        radii (numpy.ndarray): (M,) bullet radii.
+        depths (numpy.ndarray): (M,) bullet depths.
+        tolerance (float): Largest depth difference that still counts as a hit.
+        to_grid (callable, optional): Maps screen positions to the grid's coordinates.
+    Returns:
+        tuple of numpy.ndarray: Bullet indices (into positions) and the star each one hit,
+        the nearest when it overlaps several.
+    """
+    # Only stars within tolerance in depth can be hit, and on-screen radius falls off with
+    # depth, so the largest radius * depth bounds how far each bullet has to search
+    nearest_depths = np.maximum(depths - tolerance, 1e-6)
+    radius_depth = float((grid.radii * star_depths).max()) if len(star_depths) else 0.0
+    reaches = radii + np.minimum(grid.max_radius, radius_depth / nearest_depths)
+    centers = to_grid(positions) if to_grid is not None else positions
+    first_layer = np.floor((depths - tolerance - MIN_DEPTH) * (1.0 / tolerance)).astype(np.intp)
+    last_layer = np.floor((depths + tolerance - MIN_DEPTH) * (1.0 / tolerance)).astype(np.intp)
+    bullets, stars = grid.query_pairs(centers, reaches, first_layer, last_layer)
+
+    level = np.abs(star_depths[stars] - depths[bullets]) <= tolerance
+    stars, bullets = stars[level], bullets[level]
+    offsets = grid.positions[stars] - centers[bullets]
+    distances = offsets[:, 0] ** 2 + offsets[:, 1] ** 2
+    touching = distances <= (radii[bullets] + grid.radii[stars]) ** 2
+    stars, bullets, distances = stars[touching], bullets[touching], distances[touching]
+
+    # Keep the nearest star per bullet
+    order = np.lexsort((distances, bullets))
+    bullets, stars = bullets[order], stars[order]
+    first = np.ones(len(bullets), dtype=bool)
+    first[1:] = bullets[1:] != bullets[:-1]
+    return bullets[first], stars[first]
@@ -1,6 +1,6 @@
 WIDTH, HEIGHT = 1920, 1080
 FULLSCREEN = False
-NUM_STARS = 100
+NUM_STARS = 100  # Average stars on screen; the sectors around the view hold about 2-2.5x as many
 PLAYER_SPEED = 2000
 DEPTH_RATE = 0.1
 MIN_DEPTH = 0.1
@@ -34,3 +34,106 @@ DIRECTION_VECTORS = {
     "down-right": (1, 1),
     "down-left": (-1, 1),
 }
+
+# Integer bullet kinds used by the bullet pool
+BULLET_NEUTRAL = 0
+BULLET_INWARD = 1
+BULLET_OUTWARD = 2
+BULLET_POOL_CAPACITY = 4096
+
+# Fixed simulation rate (Hz) and render frame cap (0 = uncapped), set independently
+SIMULATION_RATE = 60
+RENDER_FPS = 60
+MAX_FRAME_TIME = 0.25  # Longest frame (s) fed to the simulation, so a stall can't snowball
+
+# Quantized depth layers per band in the render queue
+RENDER_DEPTH_LAYERS = 32
+
+# Dirty-rect presentation: fall back to a full flip past this share of the screen or rect count
+DIRTY_RECTS = False
+DIRTY_RECT_THRESHOLD = 0.3
+DIRTY_RECT_MAX_COUNT = 2000
+
+# Frame profiler: frames of history per phase, HUD refresh (frames) and export period (s)
+PROFILER_HISTORY = 600
+PROFILER_HUD_REFRESH = 15
+PROFILER_EXPORT_INTERVAL = 5.0
+HUD_COLOR = (0, 255, 0)
+
+# Profile capture (F4): seconds captured and seconds between stack samples
+CAPTURE_SECONDS = 5.0
+CAPTURE_SAMPLE_INTERVAL = 0.001
+
+# Bullets hit stars they overlap on screen within this depth difference
+HIT_DEPTH_TOLERANCE = 0.05
+
+# Sector-chunked universe: square sector side (px), depth bands and LRU cache budget (bytes)
+SECTOR_SIZE = 512
+UNIVERSE_DEPTH_BANDS = 16
+SECTOR_CACHE_BYTES = 32 * 1024 * 1024
+
+# Sector streaming: worker threads, look-ahead (s) and how many sectors past the view to prefetch
+STREAM_WORKERS = 2
+STREAM_LOOKAHEAD = 0.5
+STREAM_PREFETCH_SECTORS = 2
+
+# Star temporal LOD: (band depth, interval) budgets — bands at or past a depth are re-placed every interval ticks
+STAR_LOD_INTERVALS = ((0.0, 1), (0.4, 2), (0.6, 3), (0.8, 4))
+STAR_LOD_MAX_DRIFT = 1.0  # Pixels a band may drift before its stars are re-placed regardless
+
+# Cached star layers: bands at or past this depth are blitted from a surface with this padding (px),
+# as long as the layer would last this many ticks before scrolling past its padding
+STAR_LAYER_MIN_DEPTH = 0.25
+STAR_LAYER_PADDING = 256
+STAR_LAYER_MIN_TICKS = 8
+
+# Quality governor: frame budget (ms), frames per decision, and p90 load (frame time / budget) thresholds
+FRAME_BUDGET_MS = 16.6
+GOVERNOR_WINDOW = 30
+GOVERNOR_DOWNGRADE_LOAD = 1.0
+GOVERNOR_UPGRADE_LOAD = 0.6
+GOVERNOR_MAX_UPGRADE_HOLD = 32  # Windows a tier is held before retrying a raise that failed
+
+# Gravity (optional): constant (px^3 / (mass * s^2)), Barnes–Hut opening angle, softening (px), far-field
+# work per grid cell in near-field pairs and pyramid depth cap; a star's mass is GRAVITY_STAR_MASS * size / depth.
+# The opening angle is in (0, 1]; at 0.35 the error against a direct sum is under 2% for the median star and
+# about 15% at the 99th percentile, which is mostly stars whose pulls nearly cancel
+GRAVITY_CONSTANT = 20000.0
+GRAVITY_THETA = 0.35
+GRAVITY_SOFTENING = 8.0
+GRAVITY_CELL_COST = 10
+GRAVITY_MAX_LEVELS = 10
+GRAVITY_STAR_MASS = 1.0
+
+# NPC swarms (optional): ships per swarm, starting spread (px), neighbour grid cell (px; also the spacing
+# separation keeps), pixels per depth unit, depth range, speed (px/s) and steering (px/s^2) limits, rule
+# weights, and the distance (px) within which ships ease off their target. Ship sprites are drawn at
+# SWARM_SHIP_SCALE / depth, capped, in steps of 1 / SWARM_SCALE_STEPS, in their own colors, and show
+# their inward or outward variant past SWARM_PITCH (depth speed / speed).
+SWARM_SIZE = 500
+SWARM_SPAWN_SPREAD = 120.0
+SWARM_CELL_SIZE = 48
+SWARM_DEPTH_SCALE = 400.0
+SWARM_MIN_DEPTH = 0.2
+SWARM_MAX_DEPTH = 2.0
+SWARM_MIN_SPEED = 80.0
+SWARM_MAX_SPEED = 260.0
+SWARM_MAX_FORCE = 600.0
+SWARM_SEPARATION = 20.0
+SWARM_COHESION = 1.0
+SWARM_ALIGNMENT = 2.0
+SWARM_SEEK = 1.0
+SWARM_ARRIVAL_RADIUS = 240.0
+SWARM_SHIP_SCALE = 0.6
+SWARM_MAX_SHIP_SCALE = 1.5
+SWARM_SCALE_STEPS = 8
+SWARM_PITCH = 0.5
+SWARM_PALETTE = {
+    1: (230, 150, 150),
+    2: (190, 110, 110),
+    3: (150, 80, 80),
+    4: (110, 60, 60),
+    5: (255, 200, 0),
+    6: (255, 120, 0),
+    7: (255, 200, 0),
+}
@@ -0,0 +1,84 @@
+import numpy as np
+import pygame
+from constants import DIRTY_RECT_THRESHOLD, DIRTY_RECT_MAX_COUNT
+
+def circle_bounds(positions, radii):
+    """(N, 4) integer x, y, width, height rects covering circles drawn at the given centers."""
+    centers = positions.astype(np.int32)
+    radii = radii.astype(np.int32)
+    sides = 2 * radii + 1
+    return np.column_stack((centers[:, 0] - radii, centers[:, 1] - radii, sides, sides))
+
+class DirtyRectTracker:
+    """
+    Decides per frame whether to clear and present only what changed.
+    Stars are compared rect for rect against the previous frame; bullets and one-off
+    draws (ship, target box) are always treated as dirty. When the dirty area or rect
+    count grows past the limits the frame falls back to a full fill and flip.
+    """
+
+    def __init__(self, screen_size, threshold=DIRTY_RECT_THRESHOLD, max_rects=DIRTY_RECT_MAX_COUNT):
+        self.screen_area = screen_size[0] * screen_size[1]
+        self.threshold = threshold
+        self.max_rects = max_rects
+        self.previous_star_rects = None
+        self.previous_rects = []  # Bullets and one-off draws from the last frame
+        self.pending = None  # Rects to present this frame, or None for a full flip
+
+    def reset(self):
+        """Forget the previous frame, forcing the next one to be drawn in full."""
+        self.previous_star_rects = None
+        self.previous_rects = []
+
+    def plan(self, star_rects, bullet_rects):
+        """
+        Work out what has to be cleared before drawing this frame.
+        Args:
+            star_rects (numpy.ndarray): (N, 4) bounds of every star this frame.
+            bullet_rects (numpy.ndarray): (M, 4) bounds of every live bullet this frame.
+        Returns:
+            list of tuple or None: Rects to clear, or None to clear the whole screen.
+        """
+        previous_stars = self.previous_star_rects
+        self.previous_star_rects = star_rects
+        bullet_rects = bullet_rects.tolist()
+        previous_rects = self.previous_rects
+        self.previous_rects = bullet_rects
+
+        if previous_stars is None or len(previous_stars) != len(star_rects):
+            self.pending = None
+            return None
+
+        changed = np.flatnonzero((previous_stars != star_rects).any(axis=1))
+        rect_count = 2 * len(changed) + len(bullet_rects) + len(previous_rects)
+        area = (
+            (previous_stars[changed, 2] * previous_stars[changed, 3]).sum()
+            + (star_rects[changed, 2] * star_rects[changed, 3]).sum()
+            + sum(width * height for _, _, width, height in bullet_rects)
+            + sum(width * height for _, _, width, height in previous_rects)
+        )
+        if rect_count > self.max_rects or area > self.threshold * self.screen_area:
+            self.pending = None
+            return None
+
+        clear = previous_stars[changed].tolist() + previous_rects
+        self.pending = clear + star_rects[changed].tolist() + bullet_rects
+        return clear
+
+    def finish(self, drawn_rects):
+        """
+        Record one-off draws (ship, markers) made this frame.
+        Args:
+            drawn_rects (list of pygame.Rect): Areas touched by the one-off draws.
+        """
+        drawn_rects = [tuple(rect) for rect in drawn_rects]
+        self.previous_rects = self.previous_rects + drawn_rects
+        if self.pending is not None:
+            self.pending.extend(drawn_rects)
+
+    def present(self):
+        """Push this frame to the display: only the dirty rects, or a full flip."""
+        if self.pending is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self.pending)
@@ -1,33 +1,124 @@
+import os
+import time
+import numpy as np
 import pygame
-import random
 from pygame.math import Vector2
 
 from constants import *
-from star import Star
+from camera import Camera
+from starfield import StarField
+from spatial_grid import SpatialGrid
+from render_queue import RenderQueue, BAND_SHIP, BAND_OVERLAY
+from render_backend import create_backend
+from dirty_rects import DirtyRectTracker, circle_bounds
+from profiler import FrameProfiler
+from governor import QualityGovernor
+from gravity import GravityField
+from capture import ProfileCapture
+from clock import FixedClock
+from recording import InputRecorder
 from player import Player
-from bullet import Bullet
+from bullet_pool import BulletPool, bullet_kind
+from swarm import Swarm, SWARM_TARGET_PLAYER
+from collisions import Hit, find_hits, depth_layers, depth_layer_count
 from utils import draw_box
-from spaceship import SPACESHIP_SHAPES, PIXEL_SIZE, draw_spaceship
+from spaceship import bake_spaceship_sprites, draw_spaceship, get_spaceship_sprite
 
 class Game:
-    def __init__(self):
-        self.screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.FULLSCREEN if FULLSCREEN else 0)
+    def __init__(self, headless=False, seed=None, clock=None, num_stars=NUM_STARS, dirty_rects=DIRTY_RECTS,
+                 simulation_rate=SIMULATION_RATE, render_fps=RENDER_FPS, profile=False, profile_export=None,
+                 capture_prefix="capture", streaming=None, governor=None, frame_budget=FRAME_BUDGET_MS,
+                 render_scale=1.0, backend="surface", gravity=False, gravity_theta=GRAVITY_THETA,
+                 swarms=0, swarm_size=SWARM_SIZE):
+        """
+        Args:
+            headless (bool): Render through SDL's dummy video driver instead of a real window.
+            seed (int, optional): Seed for the world's random number generator; random if omitted.
+            clock (optional): Clock pacing the frame loop and simulated ticks; defaults to a
+                FixedClock at the simulation rate when headless, so headless runs go as fast
+                as they can, and to pygame.time.Clock otherwise.
+            num_stars (int): Average number of stars on screen. The field holds every star of the
+                sectors around the view, about 2-2.5x as many.
+            dirty_rects (bool): Clear and present only changed areas when little moves.
+            simulation_rate (int): Fixed simulation ticks per second.
+            render_fps (int): Render frame cap, 0 for uncapped.
+            profile (bool): Record per-phase frame timings from the start (F3 toggles the HUD).
+            profile_export (str, optional): CSV or JSON file the timings are exported to periodically.
+            capture_prefix (str): Path prefix for profile captures started with F4 or start_capture.
+            streaming (bool, optional): Generate star sectors on background threads; defaults to
+                on for windowed runs. Off keeps the world deterministic for recordings and replays.
+            governor (bool, optional): Trade quality for frame time when frames run over
+                frame_budget; defaults to on for windowed runs. Its bullet cap changes the
+                simulation, so recordings and replays run without it.
+            frame_budget (float): Frame time in milliseconds the governor aims for.
+            render_scale (float): Internal render resolution relative to the display, at most 1.0;
+                the governor may lower it further.
+            backend (str): How frames are drawn, a RENDER_BACKENDS key: "surface" for CPU
+                blits, "texture" for an SDL renderer (hardware accelerated when available).
+                Falls back to "surface" when the texture backend can't start.
+            gravity (bool): Let the stars pull the ship and each other. A targeted star is then
+                orbited for real rather than held at the screen center, and the slingshot
+                follows the orbit.
+            gravity_theta (float): Barnes–Hut opening angle of the gravity solver, in (0, 1]:
+                larger is faster and less accurate.
+            swarms (int): Number of NPC ship swarms to spawn, each chasing the player.
+            swarm_size (int): Ships per swarm.
+        """
+        self.headless = headless
+        if headless:
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
         pygame.init()
-        pygame.display.set_caption("Parallax Universe Simulator")
-        self.clock = pygame.time.Clock()
+        self.backend = create_backend(
+            backend, (WIDTH, HEIGHT), "Parallax Universe Simulator", FULLSCREEN and not headless
+        )
+        self.render_scale = 1.0
+        self.preferred_render_scale = render_scale
+        bake_spaceship_sprites()
+        if clock is None:
+            clock = FixedClock(simulation_rate) if headless else pygame.time.Clock()
+        self.clock = clock
+        self.simulation_rate = simulation_rate
+        self.simulation_step = 1.0 / simulation_rate  # Seconds per simulation tick
+        self.render_fps = render_fps
+        self.pending_events = []  # Events waiting for the next simulation tick
+        self.profiler = FrameProfiler(enabled=profile, export_path=profile_export)
+        self.governor = QualityGovernor(frame_budget, enabled=not headless if governor is None else governor)
+        self.capture_prefix = capture_prefix
+        self.capture = None  # ProfileCapture in progress
+        self.recorder = None  # InputRecorder in progress
+        if seed is None:
+            # Pick the seed explicitly so recordings can rebuild the same world
+            seed = int(np.random.SeedSequence().generate_state(1, np.uint64)[0])
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
         self.running = True
         self.player = Player()
-        self.stars = [
-            Star(
-                random.uniform(0, WIDTH),
-                random.uniform(0, HEIGHT),
-                random.uniform(MIN_DEPTH, MAX_DEPTH)
-            ) for _ in range(NUM_STARS)
-        ]
+        self.camera = Camera()
+        self.stars = StarField(num_stars, self.rng, self.camera,
+                               streaming=not headless if streaming is None else streaming)
+        self.gravity = None
+        self.set_gravity(gravity, gravity_theta)
+        self.star_grid = SpatialGrid(layers=depth_layer_count())  # Split into depth slabs for bullet hits
+        self.rebuild_star_grid()
         self.target_star = None
-        self.bullets = []
-        self.last_shot_time = 0  # Track the last time a bullet was fired
+        self.target_position = None  # Where the target was last drawn
+        self.bullets = BulletPool(BULLET_POOL_CAPACITY)
+        self.swarms = []
+        self.swarm_size = swarm_size
+        for _ in range(swarms):
+            self.spawn_swarm(swarm_size)
+        self.hits = []  # Hits from the latest tick
+        self.hit_count = 0
+        self.hit_handlers = []  # Callables notified of every Hit, e.g. for scoring and effects
+        self.render_queue = RenderQueue()
+        if dirty_rects and self.backend.supports_dirty_rects:
+            self.dirty_rects = DirtyRectTracker((WIDTH, HEIGHT))
+        else:
+            self.dirty_rects = None
+        self.ticks = 0
+        self.elapsed_time = 0  # Simulated time (ms) since the game started
         self.fire_delay = 250  # Time (ms) between shots
+        self.last_shot_time = -self.fire_delay  # Track the last time a bullet was fired
 
         pygame.event.set_allowed([
             pygame.QUIT,
@@ -40,95 +131,486 @@ class Game:
         self.current_orbital_direction = Vector2(0, -1)  # Default up
         
     def run(self):
+        accumulator = 0.0
+        profiler = self.profiler
         while self.running:
-            delta_time = self.clock.tick(60) / 1000.0  # Time since last frame in seconds
+            frame_time = self.clock.tick(self.render_fps) / 1000.0  # Time since last frame in seconds
+            work_start = time.perf_counter_ns()  # The governor judges work, not the frame cap's wait
+            accumulator += min(frame_time, MAX_FRAME_TIME)
+
+            # One input snapshot per frame; events go to the first tick that runs
+            with profiler.scope("input"):
+                self.pending_events.extend(pygame.event.get())
+                keys_pressed = pygame.key.get_pressed()
+            ticks = 0
+            while accumulator >= self.simulation_step:
+                self.step(self.simulation_step, keys_pressed)
+                accumulator -= self.simulation_step
+                ticks += 1
+
+            # Render between the last two simulation states
+            self.draw(accumulator / self.simulation_step)
+            with profiler.scope("present"):
+                self.present()
+            self.governor.record((time.perf_counter_ns() - work_start) / 1e6)
+            self.end_frame(ticks)
+
+        self.close()
+
+    def close(self):
+        """Flush the profiler export, a running capture and the input recording, and stop streaming."""
+        if self.profiler.export_path is not None:
+            self.profiler.export(self.profiler.export_path)
+        if self.capture is not None:
+            self.finish_capture().join()
+        self.stop_recording()
+        self.stars.close()
+
+    def end_frame(self, ticks=1):
+        """Hand the frame's entity counts to the profiler and close its frame."""
+        profiler = self.profiler
+        if profiler.enabled:
+            profiler.count("ticks", ticks)
+            profiler.count("stars", len(self.stars))
+            profiler.count("bullets", len(self.bullets))
+            if self.swarms:
+                profiler.count("ships", sum(len(swarm) for swarm in self.swarms))
+            profiler.count("hits", self.hit_count)
+            profiler.count("quality_tier", self.governor.tier)
+        profiler.end_frame()
+        if self.capture is not None and self.capture.expired():
+            self.finish_capture()
+
+    def start_capture(self, seconds=CAPTURE_SECONDS):
+        """
+        Profile the game loop for a while, writing .pstats and .collapsed files.
+        Does nothing if a capture is already running.
+        Args:
+            seconds (float): Length of the capture.
+        Returns:
+            ProfileCapture: The capture in progress.
+        """
+        if self.capture is None:
+            prefix = f"{self.capture_prefix}-{time.strftime('%Y%m%d-%H%M%S')}"
+            self.capture = ProfileCapture(prefix, seconds)
+            self.capture.start()
+        return self.capture
+
+    def finish_capture(self):
+        """Stop the running capture; its files are written in the background."""
+        capture, self.capture = self.capture, None
+        capture.stop()
+        return capture
+
+    def start_recording(self, path):
+        """
+        Record the input of every following tick, for replay with play_recording.
+        Args:
+            path (str): File the recording is written to when it stops.
+        """
+        gravity = self.gravity is not None
+        self.recorder = InputRecorder(path, self.seed, self.simulation_rate, self.stars.count, gravity,
+                                      self.gravity.theta if gravity else GRAVITY_THETA, len(self.swarms),
+                                      self.swarm_size)
+
+    def stop_recording(self):
+        """Finish the input recording, if any, and write it out."""
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+    def step(self, delta_time, keys_pressed=None):
+        """
+        Run one fixed simulation tick.
+        Args:
+            delta_time (float): The fixed tick length in seconds.
+            keys_pressed (optional): Key snapshot for this tick; read from pygame if omitted.
+        """
+        if keys_pressed is None:
+            keys_pressed = pygame.key.get_pressed()
+        events, self.pending_events = self.pending_events, []
+        if self.recorder is not None:
+            self.recorder.record(keys_pressed, events)
+        with self.profiler.scope("events"):
+            for event in events:
+                self.handle_event(event, keys_pressed)
+        self.update(delta_time, keys_pressed)
+
+    def simulate(self, ticks, render=False):
+        """
+        Advance the game a fixed number of ticks without an event loop, ticking the
+        clock once per simulation tick.
+        Args:
+            ticks (int): Number of ticks to run.
+            render (bool): Also draw every tick, e.g. to include rendering in measurements.
+        Returns:
+            dict: The final world state, see world_state.
+        """
+        for _ in range(ticks):
+            self.step(self.simulation_step)
+            if render:
+                self.draw()
+            self.clock.tick(self.simulation_rate)
+            self.end_frame()
+        self.close()
+        return self.world_state()
+
+    def play_recording(self, recording, render=True):
+        """
+        Replay recorded input tick by tick. The game must have been created with the
+        recording's seed, star count, simulation rate and swarms to reproduce the
+        session; gravity is switched to the recording's settings here.
+        The clock is ticked once per simulation tick, so windowed replays run at the
+        recorded speed; they stop when the window is closed.
+        Args:
+            recording (Recording): The input to replay.
+            render (bool): Draw and present every tick.
+        Returns:
+            dict: The final world state, see world_state.
+        """
+        self.set_gravity(recording.gravity, recording.gravity_theta)
+        for keys_pressed, events in recording:
+            self.pending_events.extend(events)
+            self.step(self.simulation_step, keys_pressed)
+            if render:
+                self.draw()
+                self.present()
+            if not self.headless and pygame.event.peek(pygame.QUIT):
+                break
+            self.clock.tick(self.simulation_rate)
+            self.end_frame()
+        self.close()
+        return self.world_state()
+
+    def set_gravity(self, enabled, theta=GRAVITY_THETA):
+        """
+        Turn star gravity on or off.
+        Args:
+            enabled (bool): Let the stars pull the ship and each other.
+            theta (float): Opening angle of the gravity solver, when enabled.
+        """
+        self.gravity = GravityField(theta=theta) if enabled else None
+        # Stars move within their bands under gravity, so no band stays put long enough to cache
+        self.stars.layers.min_depth = float("inf") if enabled else STAR_LAYER_MIN_DEPTH
+
+    def world_state(self):
+        """Snapshot of the simulation as plain data, for comparing runs."""
+        alive = self.bullets.alive
+        return {
+            "ticks": self.ticks,
+            "elapsed_time": self.elapsed_time,
+            "player": {
+                "position": tuple(self.player.position),
+                "velocity": tuple(self.player.velocity),
+                "boost_velocity": tuple(self.player.boost_velocity),
+                "gravity_velocity": tuple(self.player.gravity_velocity),
+                "depth": self.player.depth,
+                "direction": self.player.direction,
+                "scroll_mode": self.player.scroll_mode,
+            },
+            "target_star": self.target_star.index if self.target_star else None,
+            "hits": self.hit_count,
+            "camera": {"offset": tuple(self.camera.offset), "zoom": self.camera.zoom},
+            "stars": {
+                "positions": self.stars.positions.copy(),
+                "depths": self.stars.depths.copy(),
+            },
+            "bullets": {
+                "positions": self.bullets.positions[alive].copy(),
+                "depths": self.bullets.depths[alive].copy(),
+                "kinds": self.bullets.kinds[alive].copy(),
+            },
+            "swarms": [
+                {"positions": swarm.positions.copy(), "depths": swarm.depths.copy()} for swarm in self.swarms
+            ],
+        }
+
+    def handle_event(self, event, keys_pressed=None):
+        """Apply one pygame event to the game state."""
+        if event.type == pygame.QUIT:
+            self.running = False
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            clicked_position = self.camera.point_to_world(event.pos)
             
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.running = False
-                elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-                    clicked_position = Vector2(event.pos)
-                    
-                    # Check if a star was clicked
-                    clicked_star = next(
-                        (
-                            star for star in reversed(self.stars)
-                            if (star.position - clicked_position).length() <= max(1, int(star.size / star.depth))
-                        ), None
-                    )
-                    
-                    if clicked_star:
-                        # Target the clicked star
-                        self.target_star = clicked_star
-                    elif self.target_star:
-                        # Untarget the current star if clicking empty space
-                        self.player.handle_target_release(self.target_star, self.current_orbital_velocity)
-                        self.target_star = None
-
-                elif event.type == pygame.MOUSEWHEEL:
-                    self.player.handle_wheel(event.y, self.target_star)  # Pass target_star to handle_wheel
+            # Check if a star was clicked
+            clicked_index = self.star_grid.query_point(clicked_position)
+            
+            if clicked_index is not None:
+                # Target the clicked star
+                self.target_star = self.stars[clicked_index]
+            elif self.target_star:
+                # Untarget the current star if clicking empty space
+                self.player.handle_target_release(
+                    self.target_star, self.current_orbital_velocity,
+                    self.current_orbital_direction if self.gravity is not None else None,
+                )
+                self.target_star = None
+
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 3:
+            # Send the swarms after the clicked star, or call them back to the ship
+            clicked_index = self.star_grid.query_point(self.camera.point_to_world(event.pos))
+            target = self.stars[clicked_index] if clicked_index is not None else SWARM_TARGET_PLAYER
+            for swarm in self.swarms:
+                swarm.target = target
+
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            self.profiler.toggle_hud()
+
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+            self.start_capture()
+
+        elif event.type == pygame.MOUSEWHEEL:
+            self.player.handle_wheel(event.y, self.target_star, keys_pressed)  # Pass target_star to handle_wheel
 
+    def update(self, delta_time, keys_pressed=None):
+        """Advance the simulation by one tick."""
+        if keys_pressed is None:
+            keys_pressed = pygame.key.get_pressed()
+        self.ticks += 1
+        self.elapsed_time += delta_time * 1000.0
+        self.stars.store_previous_positions()
+        self.bullets.store_previous_positions()
+        for swarm in self.swarms:
+            swarm.store_previous_positions()
+        self.camera.store_previous_offset()
+        profiler = self.profiler
 
+        with profiler.scope("player"):
             # Handle player input
-            depth_change = self.player.handle_input(delta_time, self.target_star)
+            depth_change = self.player.handle_input(delta_time, self.target_star, keys_pressed)
 
             # Fire bullets if space is held and 0.5 seconds have passed since last shot
-            self.handle_continuous_fire()
+            self.handle_continuous_fire(keys_pressed)
 
+        with profiler.scope("center_zoom"):
             if self.target_star:
                 depth_change += self.center_zoom(delta_time)
             else:
                 self.center_zoom(delta_time)
-                
-            base_velocity = self.player.handle_input(delta_time)
-            boosted_velocity = self.player.update_boost(delta_time)
+
+        if self.gravity is not None:
+            with profiler.scope("gravity"):
+                self.apply_gravity(delta_time)
             
-            for star in self.stars:
-                star.update(boosted_velocity , depth_change, delta_time, star is self.target_star)
+        boosted_velocity = self.player.update_boost(delta_time)
+        
+        with profiler.scope("star_update"):
+            self.stars.update(boosted_velocity, depth_change, delta_time)
+        if self.target_star is not None and self.target_star.index is None:
+            self.target_star = None  # Its sector streamed out
+        with profiler.scope("star_grid"):
+            self.rebuild_star_grid()
+        if self.swarms:
+            with profiler.scope("swarms"):
+                self.update_swarms(boosted_velocity, depth_change, delta_time)
+
+        # Update bullets and recycle inactive ones
+        with profiler.scope("bullet_update"):
+            self.bullets.update(delta_time)
+        with profiler.scope("collisions"):
+            self.collide_bullets()
 
-            # Sort bullets by depth to draw them in correct order
-            self.bullets.sort(key=lambda b: b.depth, reverse=True)
+    def apply_gravity(self, delta_time):
+        """
+        Let every materialized star pull the ship and the other stars for one tick.
+        Stars attract each other where they appear, all bands in one plane, weighing
+        GRAVITY_STAR_MASS * size / depth so near stars pull harder. The ship sits at the
+        screen center, and its velocity moves a star at depth d by its velocity over d,
+        so each star's pull on it counts d times: seen from every star, the ship falls
+        toward it like any other body would.
+        Stars outside the materialized sectors neither pull nor move.
+        Args:
+            delta_time (float): The tick length in seconds.
+        """
+        stars = self.stars
+        masses = GRAVITY_STAR_MASS * stars.sizes / stars.depths
+        stars.accelerate(self.gravity.solve(stars.positions, masses), delta_time)
+        ship = self.camera.point_to_world((WIDTH / 2, HEIGHT / 2))
+        self.player.accelerate(self.gravity.pull(stars.positions, masses * stars.depths, ship), delta_time)
 
-            # Update and remove inactive bullets
-            for bullet in self.bullets:
-                bullet.update(delta_time)
+    def spawn_swarm(self, count, target=SWARM_TARGET_PLAYER):
+        """
+        Add a swarm of NPC ships around a random point on screen and depth.
+        Args:
+            count (int): Number of ships.
+            target: What the swarm chases: SWARM_TARGET_PLAYER, a star, or None to roam.
+        Returns:
+            Swarm: The new swarm.
+        """
+        center = self.rng.uniform((0, 0), (WIDTH, HEIGHT))
+        depth = self.rng.uniform(MIN_DEPTH, MAX_DEPTH)
+        swarm = Swarm(count, self.rng, center, depth, target)
+        self.swarms.append(swarm)
+        return swarm
 
-            self.bullets = [bullet for bullet in self.bullets if bullet.alive]
+    def update_swarms(self, player_velocity, depth_change, delta_time):
+        """
+        Steer and move every swarm toward its target for one tick.
+        Args:
+            player_velocity (Vector2): The player's velocity, for parallax.
+            depth_change (float): The change in depth applied to the world this tick.
+            delta_time (float): The tick length in seconds.
+        """
+        for swarm in self.swarms:
+            if swarm.target not in (None, SWARM_TARGET_PLAYER) and swarm.target.index is None:
+                swarm.target = None  # Its star's sector streamed out
+            if swarm.target is None:
+                target = None
+            elif swarm.target == SWARM_TARGET_PLAYER:
+                target = ((WIDTH / 2, HEIGHT / 2), self.player.depth)
+            else:
+                target = (swarm.target.position, swarm.target.depth)
+            swarm.update(target, player_velocity, depth_change, delta_time)
 
-            # Clear screen
-            self.screen.fill((0, 0, 0))
+    def orbital_velocity(self):
+        """
+        The ship's velocity relative to the target star, in the units of the ship's own
+        velocity: a star at depth d appears to move by the ship's velocity over d, so
+        its own velocity counts d times.
+        """
+        star = self.target_star
+        return Vector2(*self.stars.player_velocity) - star.velocity * star.depth
 
-            # Draw the stars
-            for star in self.stars:
-                star.draw(self.screen)
+    def rebuild_star_grid(self):
+        """Re-index the stars for picking and bullet hits after they moved."""
+        self.star_grid.rebuild(
+            self.stars.positions, self.stars.radii(), self.camera.offset, depth_layers(self.stars.depths)
+        )
 
-            # Draw bullets, separating by depth
-            far_bullets = [b for b in self.bullets if "inward" in b.direction or "outward" not in b.direction]
-            near_bullets = [b for b in self.bullets if "outward" in b.direction]
+    def collide_bullets(self):
+        """Retire bullets that hit a star this tick and report the hits."""
+        self.hits = []
+        slots = np.flatnonzero(self.bullets.alive)
+        if not len(slots) or not len(self.stars):
+            return
+        bullets, stars = find_hits(
+            self.star_grid, self.stars.depths, self.bullets.positions[slots], self.bullets.radii(slots),
+            self.bullets.depths[slots], to_grid=self.camera.to_world
+        )
+        if not len(bullets):
+            return
 
-            for bullet in far_bullets:
-                bullet.draw(self.screen)
+        slots = slots[bullets]
+        positions = self.bullets.positions[slots].tolist()
+        kinds = self.bullets.kinds[slots].tolist()
+        depths = self.bullets.depths[slots].tolist()
+        self.hits = [
+            Hit(self.ticks, slot, kind, star, tuple(position), depth)
+            for slot, kind, star, position, depth in zip(slots.tolist(), kinds, stars.tolist(), positions, depths)
+        ]
+        self.hit_count += len(self.hits)
+        self.bullets.kill(slots)
+        for handler in self.hit_handlers:
+            for hit in self.hits:
+                handler(hit)
 
-            # Draw the spaceship
-            spaceship_shape = SPACESHIP_SHAPES.get(self.player.direction, SPACESHIP_SHAPES["up"])
-            spaceship_width = len(spaceship_shape[0]) * PIXEL_SIZE
-            spaceship_height = len(spaceship_shape) * PIXEL_SIZE
-            spaceship_position = ((WIDTH - spaceship_width) // 2, (HEIGHT - spaceship_height) // 2)
-            draw_spaceship(self.screen, spaceship_shape, spaceship_position)
+    def draw(self, alpha=1.0):
+        """
+        Render the current frame through the backend.
+        Args:
+            alpha (float): How far between the previous and the latest simulation tick to draw.
+        """
+        profiler = self.profiler
+        quality = self.governor.current
+        self.set_render_scale(min(self.preferred_render_scale, quality.render_scale))
+        scale = self.render_scale
+        # Dirty rects track display pixels; a scaled frame is presented whole anyway
+        dirty_rects = self.dirty_rects if scale == 1.0 else None
+        with profiler.scope("draw_prepare"):
+            star_positions = self.camera.to_view(self.stars.interpolated_positions(alpha), alpha)
+            bullet_positions = self.bullets.interpolated_positions(alpha)
+            self.target_position = star_positions[self.target_star.index] if self.target_star else None
 
-            for bullet in near_bullets:
-                bullet.draw(self.screen)
+            # Only stars on screen are drawn; the field also holds the rest of their sectors.
+            # Far bands are blitted from cached layers instead of drawn star by star.
+            star_radii = self.stars.radii()
+            visible = self.stars.on_screen(star_positions, star_radii)
+            layered = self.stars.layers.prepare(self.backend, alpha)
+            if layered.any():
+                visible = visible[~layered[self.stars.bands[visible]] | self.stars.wrapped[visible]]
+            if quality.star_fraction < 1.0:
+                visible = self.stars.thin(visible, quality.star_fraction)
+            star_positions, star_radii = star_positions[visible], star_radii[visible]
+            if quality.max_star_radius is not None:
+                star_radii = np.minimum(star_radii, quality.max_star_radius)
+            if scale != 1.0:
+                # Everything is placed in logical pixels and only scaled when drawn
+                star_positions = star_positions * scale
+                star_radii = np.maximum(1, (star_radii * scale + 0.5).astype(np.int32))
 
+            # Queue everything, then draw it back to front by depth layer
+            queue = self.render_queue
+            queue.submit_stars(star_positions, star_radii, self.stars.depths[visible])
+            self.stars.layers.submit(queue)
+            queue.submit_bullets(self.bullets, bullet_positions, scale)
+            for swarm in self.swarms:
+                swarm.submit(queue, swarm.interpolated_positions(alpha), scale)
+            queue.submit(self.draw_player_ship, self.player.depth, BAND_SHIP)
             if self.target_star:
-                box_size = max(1, int(self.target_star.size / self.target_star.depth)) * 8
-                draw_box(self.screen, self.target_star.position, box_size, TARGET_COLOR)
+                queue.submit(self.draw_target_box, self.target_star.depth, BAND_OVERLAY)
+            if profiler.hud_visible and scale == 1.0:
+                # A scaled frame gets its HUD after scaling up, in present, so the text stays sharp
+                queue.submit(profiler.draw_hud, MIN_DEPTH, BAND_OVERLAY)
+
+            # Clear screen, or only what changed since the last frame
+            clear_rects = None
+            if dirty_rects:
+                if self.stars.layers.moved:
+                    dirty_rects.reset()  # A layer covers the screen; redraw it all
+                bullets = queue.bullet_indices
+                clear_rects = dirty_rects.plan(
+                    circle_bounds(star_positions, star_radii),
+                    circle_bounds(bullet_positions[bullets], self.bullets.radii(bullets)),
+                )
+            if clear_rects is None:
+                self.backend.fill((0, 0, 0))
+            else:
+                for rect in clear_rects:
+                    self.backend.fill((0, 0, 0), rect)
+
+        with profiler.scope("draw"):
+            drawn_rects = queue.flush(self.backend)
+        if dirty_rects:
+            dirty_rects.finish(drawn_rects)
+
+    def set_render_scale(self, scale):
+        """
+        Draw frames at a fraction of the display resolution from now on.
+        Args:
+            scale (float): Render resolution relative to the display; 1.0 draws straight onto it.
+        """
+        if scale == self.render_scale:
+            return
+        self.render_scale = scale
+        self.backend.set_scale(scale)
+        self.stars.layers.set_scale(scale)
+        if self.dirty_rects:
+            self.dirty_rects.reset()
+
+    def present(self):
+        """Show the frame drawn by draw."""
+        if self.render_scale != 1.0:
+            self.backend.present(self.profiler.draw_hud if self.profiler.hud_visible else None)
+        elif self.dirty_rects:
+            self.dirty_rects.present()
+        else:
+            self.backend.present()
 
-            pygame.display.flip()
+    def draw_player_ship(self, target):
+        scale = self.render_scale
+        center = (int(WIDTH // 2 * scale), int(HEIGHT // 2 * scale))
+        return draw_spaceship(target, self.player.direction, center, scale)
 
-    def handle_continuous_fire(self):
+    def draw_target_box(self, target):
+        scale = self.render_scale
+        box_size = max(1, int(self.target_star.size / self.target_star.depth)) * 8
+        return draw_box(target, Vector2(*self.target_position) * scale, int(box_size * scale), TARGET_COLOR)
+
+    def handle_continuous_fire(self, keys_pressed=None):
         """Fires a bullet every x seconds if the spacebar is held"""
-        keys_pressed = pygame.key.get_pressed()
-        current_time = pygame.time.get_ticks()
+        if keys_pressed is None:
+            keys_pressed = pygame.key.get_pressed()
+        current_time = self.elapsed_time
         
         if keys_pressed[pygame.K_SPACE]:
             if current_time - self.last_shot_time >= self.fire_delay:
@@ -137,25 +619,27 @@ class Game:
 
     def fire_bullet(self):
         """Fires a bullet from the spaceship"""
+        if len(self.bullets) >= self.governor.current.bullet_cap:
+            return
         direction = self.player.direction
         if self.player.scroll_mode == "outward":
             direction = f"{self.player.direction}_outward"
         
         bullet_position = Vector2(WIDTH // 2, HEIGHT // 2)
-        spaceship_shape = SPACESHIP_SHAPES.get(self.player.direction, SPACESHIP_SHAPES["up"])
-        spaceship_width = len(spaceship_shape[0]) * PIXEL_SIZE
-        spaceship_height = len(spaceship_shape) * PIXEL_SIZE
+        sprite = get_spaceship_sprite(self.player.direction)
 
-        # Create a new bullet and add it to the list
-        bullet = Bullet(bullet_position, direction, self.player.depth, spaceship_width, spaceship_height)
-        self.bullets.append(bullet)
+        # Claim a slot in the bullet pool
+        self.bullets.spawn(
+            bullet_position, direction.split("_")[0], bullet_kind(direction),
+            self.player.depth, sprite.width, sprite.height
+        )
 
     def center_zoom(self, delta_time):
         """
         Manages the camera's zoom and orbital behavior when targeting a star.
         
         This method handles:
-        1. Star-centered camera movement
+        1. Star-centered camera movement, unless gravity does the orbiting
         2. Depth adjustment for zoom effects
         3. Orbital velocity calculations for slingshot mechanics
         
@@ -171,21 +655,26 @@ class Game:
         # Slow down time while targeting for more controlled orbiting
         delta_time = delta_time / 1
         
-        # Calculate displacement from screen center to target
-        center = Vector2(WIDTH / 2, HEIGHT / 2)
-        displacement = (center - self.target_star.position)
-        
-        # Calculate orbital properties
-        orbital_velocity = displacement.length() / delta_time
-        orbital_direction = displacement.normalize()
-        
-        # Store orbital data for potential slingshot
-        self.current_orbital_velocity = orbital_velocity
-        self.current_orbital_direction = orbital_direction
-        
-        # Apply displacement to maintain orbit
-        for star in self.stars:
-            star.position += displacement * delta_time
+        if self.gravity is not None:
+            # The star's pull keeps the ship in orbit; the slingshot takes its real velocity
+            orbital_velocity = self.orbital_velocity()
+            self.current_orbital_velocity = orbital_velocity.length()
+            self.current_orbital_direction = orbital_velocity
+        else:
+            # Calculate displacement from screen center to target
+            center = Vector2(WIDTH / 2, HEIGHT / 2)
+            displacement = (center - self.target_star.position)
+
+            # Calculate orbital properties
+            orbital_velocity = displacement.length() / delta_time
+            orbital_direction = displacement.normalize()
+
+            # Store orbital data for potential slingshot
+            self.current_orbital_velocity = orbital_velocity
+            self.current_orbital_direction = orbital_direction
+
+            # Apply displacement to maintain orbit by moving the view, not every star
+            self.camera.move(displacement * delta_time)
         
         # Calculate depth change for zoom effect
         target_depth = MIN_DEPTH  # We zoom in towards minimum depth
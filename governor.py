@@ -0,0 +1,103 @@
+import collections
+
+import numpy as np
+from constants import (
+    BULLET_POOL_CAPACITY, FRAME_BUDGET_MS, GOVERNOR_WINDOW, GOVERNOR_DOWNGRADE_LOAD, GOVERNOR_UPGRADE_LOAD,
+    GOVERNOR_MAX_UPGRADE_HOLD,
+)
+
+# One step of quality. star_fraction is the share of per-star drawn stars kept, max_star_radius
+# caps drawn star radii (None for no cap), bullet_cap limits live bullets and render_scale is the
+# internal render resolution relative to the display.
+QualityTier = collections.namedtuple(
+    "QualityTier", ["name", "star_fraction", "max_star_radius", "bullet_cap", "render_scale"]
+)
+
+# Best first
+QUALITY_TIERS = [
+    QualityTier("full", 1.0, None, BULLET_POOL_CAPACITY, 1.0),
+    QualityTier("high", 1.0, 8, BULLET_POOL_CAPACITY, 1.0),
+    QualityTier("medium", 0.75, 4, 1024, 1.0),
+    QualityTier("low", 0.5, 2, 512, 0.5),
+    QualityTier("minimal", 0.25, 1, 256, 0.5),
+]
+
+# A tier change: frame it happened on, tiers by index, and the load (p90 frame time / budget) behind it
+QualityDecision = collections.namedtuple("QualityDecision", ["frame", "old_tier", "new_tier", "load"])
+
+class QualityGovernor:
+    """
+    Steps through quality tiers to hold frame times under a budget.
+    Frame times are judged a window at a time by their 90th percentile. A window over
+    budget drops one tier at once; a window comfortably under it raises one tier, but
+    only after the current tier has held for upgrade_hold windows. When a raise is
+    undone by the very next windows the hold doubles, so a machine sitting right at
+    the edge of a tier settles below it instead of flickering between the two.
+    """
+
+    def __init__(self, budget_ms=FRAME_BUDGET_MS, tiers=QUALITY_TIERS, window=GOVERNOR_WINDOW, enabled=True):
+        """
+        Args:
+            budget_ms (float): Target frame time in milliseconds.
+            tiers (list of QualityTier): Tiers from best to cheapest.
+            window (int): Frames judged per decision.
+            enabled (bool): Adapt at all; a disabled governor stays on the best tier.
+        """
+        self.budget_ms = budget_ms
+        self.tiers = tiers
+        self.window = window
+        self.enabled = enabled
+        self.tier = 0
+        self.frame_times = collections.deque(maxlen=window)  # Milliseconds, since the last change
+        self.frames = 0
+        self.frames_at_tier = 0
+        self.last_upgrade = None  # Frame of the latest raise
+        self.upgrade_hold = 1  # Windows to hold a tier before raising it
+        self.decisions = collections.deque(maxlen=100)  # Latest QualityDecisions, for logging
+        self.handlers = []  # Callables notified of every QualityDecision
+
+    @property
+    def current(self):
+        """The QualityTier in effect."""
+        return self.tiers[self.tier]
+
+    def record(self, frame_ms):
+        """
+        Feed the work time of one frame and change tier if the window calls for it.
+        Args:
+            frame_ms (float): Time the frame took, excluding any frame-cap wait.
+        Returns:
+            QualityDecision or None: The change made, if any.
+        """
+        self.frames += 1
+        if not self.enabled:
+            return None
+        self.frame_times.append(frame_ms)
+        self.frames_at_tier += 1
+        if self.frames_at_tier < self.window:
+            return None
+
+        load = float(np.percentile(self.frame_times, 90)) / self.budget_ms
+        if load > GOVERNOR_DOWNGRADE_LOAD and self.tier < len(self.tiers) - 1:
+            if self.last_upgrade is not None and self.frames - self.last_upgrade <= 2 * self.window:
+                self.upgrade_hold = min(2 * self.upgrade_hold, GOVERNOR_MAX_UPGRADE_HOLD)
+            else:
+                self.upgrade_hold = 1
+            return self._change(self.tier + 1, load)
+        if (
+            load < GOVERNOR_UPGRADE_LOAD and self.tier > 0
+            and self.frames_at_tier >= self.upgrade_hold * self.window
+        ):
+            self.last_upgrade = self.frames
+            return self._change(self.tier - 1, load)
+        return None
+
+    def _change(self, tier, load):
+        decision = QualityDecision(self.frames, self.tier, tier, load)
+        self.tier = tier
+        self.frames_at_tier = 0
+        self.frame_times.clear()  # Judge the new tier on its own frames
+        self.decisions.append(decision)
+        for handler in self.handlers:
+            handler(decision)
+        return decision
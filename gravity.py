@@ -0,0 +1,306 @@
+import math
+
+import numpy as np
+from constants import GRAVITY_CONSTANT, GRAVITY_THETA, GRAVITY_SOFTENING, GRAVITY_CELL_COST, GRAVITY_MAX_LEVELS
+from spatial_grid import SpatialGrid
+
+# Row and column parity of the four classes of cells a level's interactions are split into
+_PARITIES = np.array([(0, 0), (0, 1), (1, 0), (1, 1)])
+
+class GravityField:
+    """
+    Newtonian gravity between many bodies, Barnes–Hut style, on a pyramid of grids.
+    The bounding square of the bodies is cut into 2^L x 2^L leaf cells, and every
+    coarser level sums four cells into one, so building the pyramid is a few
+    bincounts and reshapes rather than a pointer-chasing quadtree. Where a quadtree
+    would adapt its depth to clumps, L is picked per solve from how clumped the
+    bodies are. A cell whose side over its distance from a body's cell is under
+    theta, measured center to center, acts on it as a single mass at its center of
+    mass; closer cells are opened one level down, and the bodies in the leaf cells
+    around a body are summed directly.
+    Far-field forces are not evaluated per body but per cell: each level adds the
+    pull of its newly accepted cells at the cell centers, with the field's gradient,
+    and hands the result down to the cells below as a first-order expansion. The
+    whole evaluation is O(N log N) and vectorized level by level.
+    """
+
+    def __init__(self, theta=GRAVITY_THETA, strength=GRAVITY_CONSTANT, softening=GRAVITY_SOFTENING,
+                 cell_cost=GRAVITY_CELL_COST, max_levels=GRAVITY_MAX_LEVELS):
+        """
+        Args:
+            theta (float): Opening angle, in (0, 1]: larger is faster and less accurate.
+            strength (float): Gravitational constant, in px^3 / (mass * s^2).
+            softening (float): Distance (px) under which attraction stops growing, so close
+                passes don't fling bodies off.
+            cell_cost (float): Far-field work per leaf cell, in near-field body pairs; sizes
+                the pyramid.
+            max_levels (int): Cap on pyramid depth.
+        """
+        if not 0.0 < theta <= 1.0:
+            raise ValueError(f"theta must be in (0, 1], got {theta}")
+        self.theta = theta
+        self.strength = strength
+        self.softening = softening
+        self.cell_cost = cell_cost
+        self.max_levels = max_levels
+
+    @property
+    def rings(self):
+        """Rings of neighbouring cells that hold every cell opened around a body's own cell."""
+        return len(near_cells(self.theta)) // 2
+
+    def pull(self, positions, masses, point):
+        """
+        Acceleration of a test body that is pulled without pulling back, e.g. the ship,
+        summed directly over every body.
+        Args:
+            positions (numpy.ndarray): (N, 2) body positions.
+            masses (numpy.ndarray): (N,) body masses.
+            point (tuple): Position of the test body.
+        Returns:
+            numpy.ndarray: (2,) acceleration.
+        """
+        deltas = positions - (point[0], point[1])
+        inverse = 1.0 / (np.einsum("ij,ij->i", deltas, deltas) + self.softening ** 2)
+        return (self.strength * masses * inverse * np.sqrt(inverse)) @ deltas
+
+    def solve(self, positions, masses):
+        """
+        Gravitational acceleration of every body.
+        Args:
+            positions (numpy.ndarray): (N, 2) body positions.
+            masses (numpy.ndarray): (N,) body masses.
+        Returns:
+            numpy.ndarray: (N, 2) accelerations.
+        """
+        count = len(positions)
+        if not count:
+            return np.zeros((0, 2))
+
+        # The root cell: a square around every body
+        low = positions.min(axis=0) - 1.0
+        extent = float((positions.max(axis=0) - low).max()) + 1.0
+        levels = self.choose_levels(positions, low, extent)
+        cells = 2 ** levels
+        leaf = extent / cells
+        side = leaf * cells  # Exactly cells leaves across, as scaling by a power of two is exact
+
+        grid = SpatialGrid(leaf, side, side)
+        grid.rebuild(positions, offset=-low)
+        expansions = self.far_field(grid.cell_ids(positions - low), positions, masses, low, side, levels)
+
+        # Far field at each body: its leaf cell's expansion about the cell center
+        columns_rows = np.clip(((positions - low) * (1.0 / leaf)).astype(np.int64), 0, cells - 1)
+        offsets = positions - (low + (columns_rows + 0.5) * leaf)
+        ax, ay, xx, xy, yy = expansions[columns_rows[:, 1] * cells + columns_rows[:, 0]].T
+        accelerations = np.column_stack((
+            ax + xx * offsets[:, 0] + xy * offsets[:, 1],
+            ay + xy * offsets[:, 0] + yy * offsets[:, 1],
+        ))
+
+        # Near field: every body in the leaf cells the far field left out, directly. Querying
+        # from the cell centers covers the square of cells around them, which is cut down to
+        # the opened ones.
+        rings = self.rings
+        reach = np.full(len(positions), rings * leaf)
+        pulled, pulling = grid.query_pairs(positions - offsets, reach)
+        steps = columns_rows[pulling] - columns_rows[pulled] + rings
+        kept = near_cells(self.theta)[steps[:, 1], steps[:, 0]] & (pulled != pulling)  # A body doesn't pull itself
+        pulled, pulling = pulled[kept], pulling[kept]
+        x = np.ascontiguousarray(positions[:, 0])
+        y = np.ascontiguousarray(positions[:, 1])
+        dx = x[pulling] - x[pulled]
+        dy = y[pulling] - y[pulled]
+        inverse = 1.0 / (dx * dx + dy * dy + self.softening ** 2)
+        pulls = self.strength * masses[pulling] * inverse * np.sqrt(inverse)  # G m / r^3
+        accelerations[:, 0] += np.bincount(pulled, pulls * dx, len(positions))
+        accelerations[:, 1] += np.bincount(pulled, pulls * dy, len(positions))
+        return accelerations
+
+    def choose_levels(self, positions, low, extent):
+        """
+        Pyramid depth for the bodies as they lie now. A deeper pyramid has more cells for
+        the far field to visit but fewer bodies per leaf for the near field to pair up, so
+        clumped bodies want it deeper than spread out ones. Bodies are counted per leaf a
+        level past one body per leaf, the counts are coarsened a level at a time, and the
+        depth with the least estimated work wins.
+        Args:
+            positions (numpy.ndarray): (N, 2) body positions.
+            low (numpy.ndarray): Corner of the root cell.
+            extent (float): Side of the root cell.
+        Returns:
+            int: Levels below the root.
+        """
+        top = int(np.clip(math.ceil(math.log(max(len(positions), 1), 4)) + 1, 1, self.max_levels))
+        cells = 2 ** top
+        columns_rows = np.clip(((positions - low) * (cells / extent)).astype(np.int64), 0, cells - 1)
+        counts = np.bincount(columns_rows[:, 1] * cells + columns_rows[:, 0], minlength=cells * cells)
+        counts = counts.reshape(cells, cells)
+        best, least = top, math.inf
+        for level in range(top, 0, -1):
+            pairs = int((counts * neighbourhood_sums(counts, self.rings)).sum())
+            work = pairs + self.cell_cost * 4 ** level
+            if work < least:
+                best, least = level, work
+            half = len(counts) // 2
+            counts = counts.reshape(half, 2, half, 2).sum(axis=(1, 3))
+        return best
+
+    def far_field(self, leaf_cells, positions, masses, low, side, levels):
+        """
+        Far-field expansion at every leaf cell's center.
+        Args:
+            leaf_cells (numpy.ndarray): (N,) flat leaf index of every body.
+            positions (numpy.ndarray): (N, 2) body positions.
+            masses (numpy.ndarray): (N,) body masses.
+            low (numpy.ndarray): Corner of the root cell.
+            side (float): Side of the root cell.
+            levels (int): Levels below the root.
+        Returns:
+            numpy.ndarray: (cells, 5) acceleration x, y and gradient xx, xy, yy, by flat leaf index.
+        """
+        cells = 2 ** levels
+        # Mass and mass-weighted position per leaf, then summed up the pyramid
+        sources = np.stack([
+            np.bincount(leaf_cells, weights, cells * cells).reshape(cells, cells)
+            for weights in (masses, masses * positions[:, 0], masses * positions[:, 1])
+        ])
+        pyramid = [sources]
+        for _ in range(levels - 1):
+            half = len(pyramid[-1][0]) // 2
+            pyramid.append(pyramid[-1].reshape(3, half, 2, half, 2).sum(axis=(2, 4)))
+        pyramid.reverse()  # Coarsest (2 x 2) first
+
+        expansions = np.zeros((1, 1, 5))
+        for level, sources in enumerate(pyramid, start=1):
+            cell = side / 2 ** level
+            # Children inherit the parent's expansion, shifted to their own centers
+            parents = len(expansions)
+            children = np.empty((parents, 2, parents, 2, 5))
+            children[...] = expansions[:, None, :, None, :]
+            expansions = children.reshape(2 * parents, 2 * parents, 5)
+            shift = np.array([-0.5, 0.5] * parents) * cell  # Child center relative to its parent's
+            expansions[..., 0] += expansions[..., 2] * shift[None, :] + expansions[..., 3] * shift[:, None]
+            expansions[..., 1] += expansions[..., 3] * shift[None, :] + expansions[..., 4] * shift[:, None]
+            self.add_interactions(expansions, sources, low, cell)
+        return expansions.reshape(-1, 5)
+
+    def add_interactions(self, expansions, sources, low, cell):
+        """
+        Add the pull of each cell's interaction list at one level: the cells that are
+        near its parent but not near itself, i.e. accepted at this level and no sooner.
+        Each source cell acts as its mass at its center plus a dipole for the offset of
+        its center of mass, so the coefficients of every offset are fixed per level and
+        the whole level takes one batched matrix product.
+        Args:
+            expansions (numpy.ndarray): (size, size, 5) expansions at the cell centers, added to.
+            sources (numpy.ndarray): (3, size, size) mass and mass-weighted x and y per cell.
+            low (numpy.ndarray): Corner of the root cell.
+            cell (float): Cell side at this level.
+        """
+        size = sources.shape[1]
+        half = size // 2
+        span = 2 * self.rings + 1  # Reach of the interaction list, in cells
+        padded = size + 2 * span
+        # Mass, and dipole about the cell center, per cell, zero past the edges
+        centers = low[:, None] + (np.arange(size) + 0.5) * cell
+        grids = np.zeros((3, padded, padded))
+        inner = grids[:, span:-span, span:-span]
+        inner[...] = sources
+        inner[1] -= sources[0] * centers[0][None, :]
+        inner[2] -= sources[0] * centers[1][:, None]
+
+        # Flat index in the padded grids of every source of every target, per parity class
+        offsets = interaction_offsets(self.theta)  # (4, K, 2)
+        shifts = (offsets + _PARITIES[:, None, :]) @ (padded, 1)
+        corners = span + np.arange(half) * 2  # Rows and columns of the even-even cells
+        corners = (corners[:, None] * padded + corners[None, :]).ravel()
+        layers = np.arange(3) * padded * padded
+        gathered = grids.take(shifts[:, None, :, None] + layers[None, :, None, None] + corners)  # (4, 3, K, n)
+        gathered = gathered.reshape(4, -1, half * half)
+        effect = self.coefficients(offsets, cell) @ gathered  # (4, 5, n)
+
+        # Class (row parity, column parity) holds the cells [2 i + row parity, 2 j + column parity]
+        effect = effect.reshape(2, 2, 5, half, half).transpose(3, 0, 4, 1, 2)
+        expansions += effect.reshape(size, size, 5)
+
+    def coefficients(self, offsets, cell):
+        """
+        Map from the mass, x dipole and y dipole of source cells to the acceleration
+        and gradient they cause at a target cell's center.
+        Args:
+            offsets (numpy.ndarray): (..., K, 2) row and column offsets of the sources.
+            cell (float): Cell side.
+        Returns:
+            numpy.ndarray: (..., 5, 3 K) coefficients.
+        """
+        dx = offsets[..., 1] * cell
+        dy = offsets[..., 0] * cell
+        inverse = 1.0 / (dx * dx + dy * dy + self.softening ** 2)
+        pull = self.strength * inverse * np.sqrt(inverse)  # G / r^3
+        tidal = 3.0 * pull * inverse  # 3 G / r^5
+        xx = tidal * dx * dx - pull
+        xy = tidal * dx * dy
+        yy = tidal * dy * dy - pull
+        zero = np.zeros_like(dx)
+        # Moving a source by d changes its pull by minus the gradient times d
+        return np.stack([
+            np.concatenate((pull * dx, -xx, -xy), axis=-1),
+            np.concatenate((pull * dy, -xy, -yy), axis=-1),
+            np.concatenate((xx, zero, zero), axis=-1),
+            np.concatenate((xy, zero, zero), axis=-1),
+            np.concatenate((yy, zero, zero), axis=-1),
+        ], axis=-2)
+
+def neighbourhood_sums(grid, rings):
+    """Sum over every cell's (2 rings + 1)^2 neighbourhood of a 2D grid, zero past its edges."""
+    size = len(grid)
+    span = 2 * rings + 1
+    # Summed-area table of the padded grid, with a leading row and column of zeros
+    table = np.zeros((size + span, size + span), dtype=grid.dtype)
+    table[rings + 1:rings + 1 + size, rings + 1:rings + 1 + size] = grid
+    table = table.cumsum(axis=0).cumsum(axis=1)
+    return table[span:, span:] - table[:size, span:] - table[span:, :size] + table[:size, :size]
+
+_NEAR_CELLS = {}
+
+def near_cells(theta):
+    """
+    (2 rings + 1, 2 rings + 1) mask of the row and column offsets, from the middle, of
+    the cells a cell opens rather than accepts: those whose side over their distance,
+    center to center, is at least theta. The opened cells form a disk, so the parent
+    of an opened cell is always opened too and no cell is counted twice.
+    """
+    near = _NEAR_CELLS.get(theta)
+    if near is None:
+        radius = 1.0 / theta
+        steps = np.arange(-int(radius), int(radius) + 1)
+        near = _NEAR_CELLS[theta] = steps[:, None] ** 2 + steps[None, :] ** 2 <= radius * radius
+    return near
+
+_INTERACTION_OFFSETS = {}
+
+def interaction_offsets(theta):
+    """
+    (4, K, 2) row and column offsets from a cell to its interaction list, for each
+    parity class in _PARITIES: cells below its parent's opened cells that it doesn't
+    open itself. Every class has the same number of them, as the opened cells are
+    symmetric about the middle.
+    """
+    offsets = _INTERACTION_OFFSETS.get(theta)
+    if offsets is None:
+        near = near_cells(theta)
+        rings = len(near) // 2
+        span = range(-(2 * rings + 1), 2 * rings + 2)
+
+        def opened(row, column):
+            return abs(row) <= rings and abs(column) <= rings and near[row + rings, column + rings]
+
+        offsets = _INTERACTION_OFFSETS[theta] = np.array([
+            [
+                (row, column) for row in span for column in span
+                if opened((row_parity + row) // 2, (column_parity + column) // 2) and not opened(row, column)
+            ]
+            for row_parity, column_parity in _PARITIES.tolist()
+        ], dtype=np.int64)
+    return offsets
@@ -1,4 +1,82 @@
+import argparse
+
+from constants import SIMULATION_RATE, RENDER_FPS, FRAME_BUDGET_MS, GRAVITY_THETA, SWARM_SIZE
 from game import Game
+from render_backend import RENDER_BACKENDS
+from recording import Recording, MAX_SWARM_FIELD
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Parallax Universe Simulator")
+    parser.add_argument("--headless", action="store_true", help="run without a window and exit after --ticks")
+    parser.add_argument("--seed", type=int, default=None, help="seed for the world generator")
+    parser.add_argument("--ticks", type=int, default=600, help="ticks to simulate in headless mode")
+    parser.add_argument("--sim-rate", type=int, default=SIMULATION_RATE, help="fixed simulation ticks per second")
+    parser.add_argument("--render-fps", type=int, default=RENDER_FPS, help="render frame cap, 0 for uncapped")
+    parser.add_argument("--dirty-rects", action="store_true", help="clear and present only changed areas")
+    parser.add_argument("--frame-budget", type=float, default=FRAME_BUDGET_MS, metavar="MS",
+                        help="frame time the quality governor aims for")
+    parser.add_argument("--fixed-quality", action="store_true", help="never lower quality to hold the frame budget")
+    parser.add_argument("--render-scale", type=float, default=1.0, metavar="SCALE",
+                        help="internal render resolution relative to the window, in (0, 1], e.g. 0.5")
+    parser.add_argument("--backend", choices=sorted(RENDER_BACKENDS), default="surface",
+                        help="draw with CPU surface blits or an SDL texture renderer")
+    parser.add_argument("--gravity", action="store_true",
+                        help="let stars pull the ship and each other")
+    parser.add_argument("--gravity-theta", type=float, default=GRAVITY_THETA, metavar="THETA",
+                        help="gravity solver opening angle in (0, 1]: larger is faster and less accurate")
+    parser.add_argument("--swarms", type=int, default=0, metavar="N",
+                        help="spawn N NPC ship swarms that chase the ship (right click a star to send them after it)")
+    parser.add_argument("--swarm-size", type=int, default=SWARM_SIZE, metavar="SHIPS", help="ships per swarm")
+    parser.add_argument("--profile", action="store_true", help="record per-phase frame timings from the start")
+    parser.add_argument("--profile-export", metavar="PATH", help="export frame timings to a .csv or .json file")
+    parser.add_argument("--capture", type=float, metavar="SECONDS",
+                        help="profile the first SECONDS of the run (F4 captures on demand)")
+    parser.add_argument("--capture-prefix", default="capture", help="path prefix for .pstats/.collapsed captures")
+    parser.add_argument("--record", metavar="PATH", help="record the session's input for replay")
+    parser.add_argument("--replay", metavar="PATH", help="replay a recorded session in its original world")
+    args = parser.parse_args()
+    if not 0.0 < args.render_scale <= 1.0:
+        parser.error(f"--render-scale must be in (0, 1], got {args.render_scale}")
+    if not 0.0 < args.gravity_theta <= 1.0:
+        parser.error(f"--gravity-theta must be in (0, 1], got {args.gravity_theta}")
+    if not 0 <= args.swarms <= MAX_SWARM_FIELD:
+        parser.error(f"--swarms must be in [0, {MAX_SWARM_FIELD}], got {args.swarms}")
+    if not 1 <= args.swarm_size <= MAX_SWARM_FIELD:
+        parser.error(f"--swarm-size must be in [1, {MAX_SWARM_FIELD}], got {args.swarm_size}")
+    return args
 
 if __name__ == "__main__":
-    Game().run()
+    args = parse_args()
+    recording = Recording.load(args.replay) if args.replay else None
+    options = dict(seed=args.seed, simulation_rate=args.sim_rate, gravity=args.gravity,
+                   gravity_theta=args.gravity_theta, swarms=args.swarms, swarm_size=args.swarm_size)
+    if recording is not None:
+        options = dict(seed=recording.seed, simulation_rate=recording.simulation_rate,
+                       num_stars=recording.num_stars, gravity=recording.gravity,
+                       gravity_theta=recording.gravity_theta, swarms=recording.swarms,
+                       swarm_size=recording.swarm_size)
+    if args.fixed_quality:
+        options["governor"] = False
+    if args.record or recording is not None:
+        # Streamed sectors and quality changes depend on timing, which a replay can't reproduce
+        options["streaming"] = False
+        options["governor"] = False
+    game = Game(headless=args.headless, dirty_rects=args.dirty_rects, render_fps=args.render_fps,
+                profile=args.profile, profile_export=args.profile_export, capture_prefix=args.capture_prefix,
+                frame_budget=args.frame_budget, render_scale=args.render_scale, backend=args.backend,
+                **options)
+    if args.record:
+        game.start_recording(args.record)
+    if args.capture:
+        game.start_capture(args.capture)
+
+    if recording is not None:
+        state = game.play_recording(recording)
+    elif args.headless:
+        state = game.simulate(args.ticks)
+    else:
+        game.run()
+        state = None
+    if state is not None and args.headless:
+        print(f"ticks={state['ticks']} player={state['player']['position']} "
+              f"bullets={len(state['bullets']['depths'])}")
@@ -2,6 +2,7 @@ import pygame
 from pygame.math import Vector2
 from constants import *
 from utils import *
+from topology import wrap_point
 import math
 from spaceship import *
 
@@ -26,45 +27,57 @@ class Player:
         self.boost_duration = 0.0
         self.max_boost_duration = 3
         self.depth_buffer = DEPTH_RATE * 2
+        self.gravity_velocity = Vector2(0, 0)  # Picked up from the stars' pull; kept until pulled otherwise
 
         self.manual_control_active = False  # Tracks if player is actively controlling
         self.manual_control_timeout = 0.5   # How long to maintain manual control after input
         self.manual_control_timer = 0.0     # Timer for manual control timeout
         self.target_direction = "up"        # Stores the direction to target
         
-    def handle_target_release(self, target_star, orbital_velocity):
+    def handle_target_release(self, target_star, orbital_velocity, orbital_direction=None):
         """
         Handles the slingshot boost when releasing a target star.
         Now properly considers the ship's actual facing direction.
+        With gravity on, the ship really orbits the star, and the boost follows its
+        orbital velocity instead.
         
         Args:
             target_star: The star being released
             orbital_velocity: Current orbital velocity around the star
+            orbital_direction (Vector2, optional): Direction of the ship's real orbital
+                velocity, whose speed is orbital_velocity; given when gravity is on
         """
         if target_star is None:
             return
 
-        # Get the raw direction without scroll modifiers
-        base_direction = self.direction.split('_')[0] if '_' in self.direction else self.direction
-        
-        # Get the direction vector based on the ship's current facing
-        boost_direction = Vector2(DIRECTION_VECTORS[base_direction])
-        boost_direction = boost_direction.normalize()
-
-        # Calculate boost magnitude based on orbital velocity
         MAX_BOOST_SPEED = 10000
-        relative_speed = target_star.relative_velocity.length()
-        boost_magnitude = min(relative_speed * 2.0, MAX_BOOST_SPEED)
+        if orbital_direction is not None and orbital_direction.length_squared() > 0:
+            # Carry on along the orbit, faster
+            boost_direction = orbital_direction.normalize()
+            boost_magnitude = min(orbital_velocity * 2.0, MAX_BOOST_SPEED)
+        else:
+            # Get the raw direction without scroll modifiers
+            base_direction = self.direction.split('_')[0] if '_' in self.direction else self.direction
+
+            # Get the direction vector based on the ship's current facing
+            boost_direction = Vector2(DIRECTION_VECTORS[base_direction])
+            boost_direction = boost_direction.normalize()
+
+            # Calculate boost magnitude based on orbital velocity
+            relative_speed = target_star.relative_velocity.length()
+            boost_magnitude = min(relative_speed * 2.0, MAX_BOOST_SPEED)
         
-        # Apply the boost in the ship's facing direction
+        # Apply the boost
         self.boost_velocity = boost_direction * boost_magnitude
         self.boost_duration = self.max_boost_duration
 
-    def handle_input(self, delta_time, target_star=None):
+    def handle_input(self, delta_time, target_star=None, keys_pressed=None):
         """
         Enhanced input handler with improved direction management.
+        Takes the tick's key snapshot when given, otherwise reads pygame.key.get_pressed().
         """
-        keys_pressed = pygame.key.get_pressed()
+        if keys_pressed is None:
+            keys_pressed = pygame.key.get_pressed()
         depth_change = 0.0
 
         current_manual_input = any([
@@ -161,7 +174,7 @@ class Player:
                 
         return self.last_direction 
         
-    def handle_wheel(self, y, target_star=None):
+    def handle_wheel(self, y, target_star=None, keys_pressed=None):
         """
         Handle scroll wheel input with buffered depth limits for targeted stars.
         Maintains ship facing direction even when scroll movement is restricted.
@@ -169,6 +182,7 @@ class Player:
         Args:
             y (int): Scroll direction (-1 for scroll down, 1 for scroll up)
             target_star (Star, optional): Currently targeted star, if any
+            keys_pressed (optional): Key snapshot for this tick; read from pygame if omitted
         """
         if y != 0:
             self.manual_control_active = True
@@ -194,12 +208,12 @@ class Player:
             # Block scroll state change if it would exceed depth limits
             if requested_scroll_mode == "inward" and target_star.depth <= min_depth_with_buffer:
                 # Allow direction update but prevent actual scrolling
-                self._update_direction_only(requested_scroll_mode)
+                self._update_direction_only(requested_scroll_mode, keys_pressed)
                 return
                 
             if requested_scroll_mode == "outward" and target_star.depth >= max_depth_with_buffer:
                 # Allow direction update but prevent actual scrolling
-                self._update_direction_only(requested_scroll_mode)
+                self._update_direction_only(requested_scroll_mode, keys_pressed)
                 return
         
         # If we reach here, apply full scroll mode change
@@ -214,16 +228,20 @@ class Player:
         else:
             self.wheel = 0
 
-    def _update_direction_only(self, scroll_mode):
+    def _update_direction_only(self, scroll_mode, keys_pressed=None):
         """
         Updates the ship's facing direction without changing scroll state or depth.
         This allows firing in any direction even when movement is restricted.
         
         Args:
             scroll_mode (str): The requested scroll mode that determines direction
+            keys_pressed (optional): Key snapshot for this tick; read from pygame if omitted
         """
+        if keys_pressed is None:
+            keys_pressed = pygame.key.get_pressed()
+
         # Update visual direction without changing scroll behavior
-        current_direction = get_direction(pygame.key.get_pressed(), BASE_DIRECTION_MAP)
+        current_direction = get_direction(keys_pressed, BASE_DIRECTION_MAP)
         base_direction = current_direction or self.last_direction
         
         # Set the visual direction with the scroll modifier
@@ -237,24 +255,21 @@ class Player:
     def _update_position(self):
         """Updates player position with toroidal wrapping."""
         self.position += self.velocity
+        self.position.update(wrap_point(self.position.x, self.position.y))
 
-        if self.position.x < 0:
-            self.position.x += WIDTH
-            self.position.y = HEIGHT - self.position.y
-        elif self.position.x > WIDTH:
-            self.position.x -= WIDTH
-            self.position.y = HEIGHT - self.position.y
-
-        if self.position.y < 0:
-            self.position.y += HEIGHT
-            self.position.x = WIDTH - self.position.x
-        elif self.position.y > HEIGHT:
-            self.position.y -= HEIGHT
-            self.position.x = WIDTH - self.position.x
+    def accelerate(self, acceleration, delta_time):
+        """
+        Apply an outside pull, e.g. the stars' gravity, to the ship's drift.
+        Args:
+            acceleration (tuple): Acceleration in px / s^2.
+            delta_time (float): The tick length in seconds.
+        """
+        self.gravity_velocity += Vector2(acceleration[0], acceleration[1]) * delta_time
 
     def update_boost(self, delta_time):
+        velocity = self.velocity + self.gravity_velocity
         if self.boost_duration > 0:
             self.boost_duration -= delta_time
             self.boost_velocity *= self.boost_decay_rate
-            return self.velocity + self.boost_velocity
-        return self.velocity
+            return velocity + self.boost_velocity
+        return velocity
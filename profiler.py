@@ -0,0 +1,239 @@
+import csv
+import json
+import os
+import time
+
+import numpy as np
+import pygame
+from constants import PROFILER_HISTORY, PROFILER_HUD_REFRESH, PROFILER_EXPORT_INTERVAL, HUD_COLOR
+
+class _Scope:
+    """Context manager that adds its run time to one phase of the current frame."""
+    __slots__ = ("totals", "name", "start")
+
+    def __init__(self, totals, name):
+        self.totals = totals
+        self.name = name
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.totals[self.name] += time.perf_counter_ns() - self.start
+        return False
+
+class _NullScope:
+    """Stand-in scope used while profiling is off."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+NULL_SCOPE = _NullScope()
+
+class FrameProfiler:
+    """
+    Per-phase frame timer with ring-buffered history.
+    Phases are timed with perf_counter_ns scopes and summed per frame, since a
+    phase such as star_update can run several times in one rendered frame. Each
+    end_frame writes the totals and entity counts into fixed-size ring buffers.
+    While disabled every scope is a shared no-op and end_frame returns at once.
+    """
+
+    def __init__(self, history=PROFILER_HISTORY, enabled=False, export_path=None,
+                 export_interval=PROFILER_EXPORT_INTERVAL):
+        """
+        Args:
+            history (int): Frames kept per phase.
+            enabled (bool): Start recording straight away.
+            export_path (str, optional): File exported every export_interval seconds, .csv or .json.
+            export_interval (float): Seconds between periodic exports.
+        """
+        self.history = history
+        self.export_path = export_path
+        self.export_interval = export_interval
+        self.hud_visible = False
+        self.font = None
+        self.reset()
+        self.enabled = enabled or export_path is not None
+
+    def reset(self):
+        """Drop all recorded frames."""
+        self.frames = 0  # Frames recorded so far; the ring holds the last `history` of them
+        self.totals = {}  # Phase -> nanoseconds spent this frame
+        self.scopes = {}
+        self.samples = {}  # Phase or count -> ring buffer
+        self.frame_numbers = np.zeros(self.history, dtype=np.int64)
+        self.counts = {}  # Count name -> value this frame
+        self.frame_start = time.perf_counter_ns()
+        self.exported_frames = 0
+        self.last_export = time.perf_counter()
+        self.hud_surface = None
+        self.hud_frame = -PROFILER_HUD_REFRESH
+
+    def toggle_hud(self):
+        """Show or hide the overlay; profiling runs while it is visible."""
+        self.hud_visible = not self.hud_visible
+        self.enabled = self.hud_visible or self.export_path is not None
+        self.hud_surface = None
+
+    def scope(self, name):
+        """
+        Time a block as part of a phase.
+        Args:
+            name (str): Phase name.
+        Returns:
+            A context manager; a shared no-op one when profiling is off.
+        """
+        if not self.enabled:
+            return NULL_SCOPE
+        scope = self.scopes.get(name)
+        if scope is None:
+            self.totals[name] = 0
+            scope = self.scopes[name] = _Scope(self.totals, name)
+        return scope
+
+    def count(self, name, value):
+        """Record an entity count for the current frame."""
+        self.counts[name] = value
+
+    def end_frame(self):
+        """Close the current frame: store its phase totals and counts in the ring buffers."""
+        now = time.perf_counter_ns()
+        if not self.enabled:
+            self.frame_start = now
+            return
+        slot = self.frames % self.history
+        self._ring("frame")[slot] = now - self.frame_start
+        self.frame_start = now
+        totals = self.totals
+        for name in totals:
+            self._ring(name)[slot] = totals[name]
+            totals[name] = 0
+        for name, value in self.counts.items():
+            self._ring(name)[slot] = value
+        self.frame_numbers[slot] = self.frames
+        self.frames += 1
+
+        if self.export_path is not None and time.perf_counter() - self.last_export >= self.export_interval:
+            self.export(self.export_path)
+
+    def _ring(self, name):
+        ring = self.samples.get(name)
+        if ring is None:
+            ring = self.samples[name] = np.zeros(self.history, dtype=np.int64)
+        return ring
+
+    def recent(self):
+        """
+        Recorded frames in chronological order.
+        Returns:
+            tuple: Frame numbers and a dict of name -> values (nanoseconds for phases).
+        """
+        size = min(self.frames, self.history)
+        order = np.arange(self.frames - size, self.frames) % self.history
+        return self.frame_numbers[order], {name: ring[order] for name, ring in self.samples.items()}
+
+    def phase_names(self):
+        """Timed phases, with the whole frame first."""
+        return ["frame"] + [name for name in self.scopes if name in self.samples]
+
+    def count_names(self):
+        """Recorded entity counts."""
+        return [name for name in self.samples if name != "frame" and name not in self.scopes]
+
+    def summary(self):
+        """
+        Rolling statistics over the recorded history.
+        Returns:
+            dict: Phase -> p50/p95/p99/mean/max in milliseconds, and "counts" -> latest value per count.
+        """
+        _, values = self.recent()
+        stats = {}
+        if not self.frames:
+            return stats
+        for name in self.phase_names():
+            milliseconds = values[name] / 1e6
+            p50, p95, p99 = np.percentile(milliseconds, [50, 95, 99])
+            stats[name] = {"p50": p50, "p95": p95, "p99": p99, "mean": milliseconds.mean(),
+                           "max": milliseconds.max()}
+        stats["counts"] = {name: int(values[name][-1]) for name in self.count_names()}
+        return stats
+
+    def export(self, path):
+        """
+        Write the recorded frames to path.
+        CSV files get one row per frame, appending only frames not exported yet; JSON
+        files are rewritten with the rolling summary and the frames still in history.
+        Args:
+            path (str): Destination ending in .csv or .json.
+        """
+        self.last_export = time.perf_counter()
+        frame_numbers, values = self.recent()
+        phases = self.phase_names()
+        counts = self.count_names()
+
+        if os.path.splitext(path)[1].lower() == ".json":
+            report = {
+                "frames": self.frames,
+                "summary_ms": self.summary(),
+                "samples": {
+                    "frame_numbers": frame_numbers.tolist(),
+                    **{name + "_ms": (values[name] / 1e6).tolist() for name in phases},
+                    **{name: values[name].tolist() for name in counts},
+                },
+            }
+            with open(path, "w") as file:
+                json.dump(report, file, indent=2)
+        else:
+            new = frame_numbers >= self.exported_frames
+            first = self.exported_frames == 0
+            with open(path, "w" if first else "a", newline="") as file:
+                writer = csv.writer(file)
+                if first:
+                    writer.writerow(["frame"] + [name + "_ms" for name in phases] + counts)
+                columns = [values[name][new] / 1e6 for name in phases] + [values[name][new] for name in counts]
+                for row in zip(frame_numbers[new].tolist(), *(column.tolist() for column in columns)):
+                    writer.writerow(row)
+        self.exported_frames = self.frames
+
+    def draw_hud(self, surface, position=(10, 10)):
+        """
+        Draw rolling p50/p99 per phase and the entity counts in a corner of surface.
+        The text is re-rendered every few frames and blitted from cache in between.
+        Returns:
+            pygame.Rect or None: The area drawn, or None when the HUD is hidden.
+        """
+        if not self.hud_visible:
+            return None
+        if self.hud_surface is None or self.frames - self.hud_frame >= PROFILER_HUD_REFRESH:
+            self.hud_surface = self._render_hud()
+            self.hud_frame = self.frames
+        return surface.blit(self.hud_surface, position)
+
+    def _render_hud(self):
+        if self.font is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            self.font = pygame.font.SysFont("monospace", 14)
+        font = self.font
+        stats = self.summary()
+        lines = [f"{'phase':<14}{'p50':>8}{'p99':>8}  ms"]
+        for name in self.phase_names():
+            if name in stats:
+                lines.append(f"{name:<14}{stats[name]['p50']:>8.2f}{stats[name]['p99']:>8.2f}")
+        for name, value in stats.get("counts", {}).items():
+            lines.append(f"{name:<14}{value:>8}")
+
+        rendered = [font.render(line, True, HUD_COLOR) for line in lines]
+        height = font.get_linesize()
+        hud = pygame.Surface((max(line.get_width() for line in rendered) + 8, height * len(rendered) + 8))
+        hud.fill((0, 0, 0))
+        for row, line in enumerate(rendered):
+            hud.blit(line, (4, 4 + row * height))
+        return hud
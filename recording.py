@@ -0,0 +1,214 @@
+import struct
+
+import pygame
+from constants import GRAVITY_THETA, SWARM_SIZE
+
+# Keys the simulation reads; a tick's key state is stored as a bitmask in this order
+RECORDED_KEYS = [
+    pygame.K_w,
+    pygame.K_a,
+    pygame.K_s,
+    pygame.K_d,
+    pygame.K_q,
+    pygame.K_e,
+    pygame.K_SPACE,
+]
+
+MAGIC = b"PVIR"
+VERSION = 2
+# Magic, version, seed, simulation rate, star count, gravity on, gravity opening angle, swarms, ships per swarm
+HEADER = struct.Struct("<4sBQHI?dHH")
+MAX_SWARM_FIELD = 0xFFFF  # Largest swarm count and ships per swarm the header holds
+
+# Record flags
+FLAG_KEYS = 0x01    # Followed by the key mask XORed with the previous one
+FLAG_EVENTS = 0x02  # Followed by an event count and the events
+FLAG_END = 0x80     # Last record; its tick is the total tick count
+
+EVENT_CLICK = 0
+EVENT_WHEEL = 1
+
+def write_varint(buffer, value):
+    """Append a non-negative int as an unsigned LEB128 varint."""
+    while value >= 0x80:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+def read_varint(data, offset):
+    """Read an unsigned LEB128 varint. Returns the value and the offset after it."""
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+def zigzag(value):
+    """Map a signed int onto a non-negative one so small magnitudes stay short."""
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+def unzigzag(value):
+    return value // 2 if value % 2 == 0 else -(value + 1) // 2
+
+def key_mask(keys_pressed):
+    """Pack the recorded keys of a pygame.key.get_pressed() snapshot into an int."""
+    mask = 0
+    for bit, key in enumerate(RECORDED_KEYS):
+        if keys_pressed[key]:
+            mask |= 1 << bit
+    return mask
+
+class ReplayKeys:
+    """Stands in for pygame.key.get_pressed() with a recorded key mask."""
+    __slots__ = ("mask",)
+
+    def __init__(self, mask):
+        self.mask = mask
+
+    def __getitem__(self, key):
+        try:
+            return bool(self.mask >> RECORDED_KEYS.index(key) & 1)
+        except ValueError:
+            return False
+
+class InputRecorder:
+    """
+    Records the input fed to each simulation tick in a compact binary format.
+    After the header, a record is only written for ticks where something happened:
+    the varint tick distance from the previous record, a flags byte, then the key
+    mask delta and/or the mouse clicks and wheel moves delivered on that tick.
+    Holding a key costs nothing until it is released.
+    """
+
+    def __init__(self, path, seed, simulation_rate, num_stars, gravity=False, gravity_theta=GRAVITY_THETA,
+                 swarms=0, swarm_size=SWARM_SIZE):
+        """
+        Args:
+            path (str): Where the recording is written on close.
+            seed (int): Seed of the recorded world.
+            simulation_rate (int): Simulation ticks per second.
+            num_stars (int): Number of stars in the recorded world.
+            gravity (bool): Whether the stars pull the ship and each other.
+            gravity_theta (float): Opening angle of the gravity solver.
+            swarms (int): Number of NPC ship swarms spawned with the world.
+            swarm_size (int): Ships per swarm.
+        """
+        self.path = path
+        self.buffer = bytearray(HEADER.pack(
+            MAGIC, VERSION, seed, simulation_rate, num_stars, gravity, gravity_theta, swarms, swarm_size
+        ))
+        self.tick = 0
+        self.last_record_tick = 0
+        self.mask = 0
+
+    def record(self, keys_pressed, events):
+        """
+        Record one simulation tick.
+        Args:
+            keys_pressed: The key snapshot the tick ran with.
+            events (list of pygame.event.Event): Events delivered on the tick.
+        """
+        mask = key_mask(keys_pressed)
+        recorded = [event for event in events if _event_recorded(event)]
+        flags = (FLAG_KEYS if mask != self.mask else 0) | (FLAG_EVENTS if recorded else 0)
+        if flags:
+            buffer = self.buffer
+            write_varint(buffer, self.tick - self.last_record_tick)
+            buffer.append(flags)
+            if flags & FLAG_KEYS:
+                write_varint(buffer, mask ^ self.mask)
+                self.mask = mask
+            if flags & FLAG_EVENTS:
+                write_varint(buffer, len(recorded))
+                for event in recorded:
+                    if event.type == pygame.MOUSEBUTTONDOWN:
+                        buffer.append(EVENT_CLICK)
+                        write_varint(buffer, event.button)
+                        write_varint(buffer, zigzag(int(event.pos[0])))
+                        write_varint(buffer, zigzag(int(event.pos[1])))
+                    else:
+                        buffer.append(EVENT_WHEEL)
+                        write_varint(buffer, zigzag(int(event.y)))
+            self.last_record_tick = self.tick
+        self.tick += 1
+
+    def close(self):
+        """Terminate the recording and write it to disk."""
+        write_varint(self.buffer, self.tick - self.last_record_tick)
+        self.buffer.append(FLAG_END)
+        with open(self.path, "wb") as file:
+            file.write(self.buffer)
+
+def _event_recorded(event):
+    return event.type == pygame.MOUSEWHEEL or event.type == pygame.MOUSEBUTTONDOWN
+
+class Recording:
+    """A decoded input recording."""
+
+    def __init__(self, seed, simulation_rate, num_stars, gravity, gravity_theta, swarms, swarm_size, ticks, records):
+        self.seed = seed
+        self.simulation_rate = simulation_rate
+        self.num_stars = num_stars
+        self.gravity = gravity
+        self.gravity_theta = gravity_theta
+        self.swarms = swarms
+        self.swarm_size = swarm_size
+        self.ticks = ticks  # Total recorded ticks
+        self.records = records  # Tick -> (key mask or None, list of events)
+
+    @classmethod
+    def load(cls, path):
+        """Read and decode a file written by InputRecorder."""
+        with open(path, "rb") as file:
+            data = file.read()
+        magic, version, *world = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} input recording")
+
+        records = {}
+        offset = HEADER.size
+        tick = 0
+        mask = 0
+        while True:
+            distance, offset = read_varint(data, offset)
+            tick += distance
+            flags = data[offset]
+            offset += 1
+            if flags & FLAG_END:
+                return cls(*world, tick, records)
+
+            new_mask = None
+            events = []
+            if flags & FLAG_KEYS:
+                change, offset = read_varint(data, offset)
+                mask ^= change
+                new_mask = mask
+            if flags & FLAG_EVENTS:
+                count, offset = read_varint(data, offset)
+                for _ in range(count):
+                    kind = data[offset]
+                    offset += 1
+                    if kind == EVENT_CLICK:
+                        button, offset = read_varint(data, offset)
+                        x, offset = read_varint(data, offset)
+                        y, offset = read_varint(data, offset)
+                        events.append(pygame.event.Event(
+                            pygame.MOUSEBUTTONDOWN, button=button, pos=(unzigzag(x), unzigzag(y))
+                        ))
+                    else:
+                        wheel, offset = read_varint(data, offset)
+                        events.append(pygame.event.Event(pygame.MOUSEWHEEL, x=0, y=unzigzag(wheel)))
+            records[tick] = (new_mask, events)
+
+    def __iter__(self):
+        """Yield the key snapshot and events of every tick, in order."""
+        keys = ReplayKeys(0)
+        for tick in range(self.ticks):
+            mask, events = self.records.get(tick, (None, []))
+            if mask is not None:
+                keys = ReplayKeys(mask)
+            yield keys, events
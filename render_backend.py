@@ -0,0 +1,314 @@
+import weakref
+
+import numpy as np
+import pygame
+from star_renderer import StarRenderer
+from constants import STAR_COLOR
+
+class RenderBackend:
+    """
+    What a frame is drawn through. The render queue and the one-off draw calls only
+    use these methods, so a frame can go to a CPU surface or to an SDL renderer.
+    blit and fill take the same arguments as their pygame.Surface counterparts, so
+    code that blits a cached surface works on either. Coordinates are render pixels:
+    logical pixels times the current scale.
+    """
+
+    name = None
+    supports_dirty_rects = False  # Whether presenting only part of the frame is possible
+
+    def __init__(self, size):
+        self.size = size  # Display size in pixels
+        self.scale = 1.0
+
+    def get_size(self):
+        """Size of what is drawn on, in render pixels."""
+        width, height = self.size
+        if self.scale == 1.0:
+            return self.size
+        return (max(1, round(width * self.scale)), max(1, round(height * self.scale)))
+
+    def set_scale(self, scale):
+        """Draw at a fraction of the display resolution from now on; present scales it back up."""
+        raise NotImplementedError
+
+    def create_surface(self, size):
+        """A surface for pre-rendering something that is blitted every frame, e.g. a star layer."""
+        return pygame.Surface(size)
+
+    def refresh(self, surface):
+        """Note that a surface blitted before has been redrawn since."""
+
+    def fill(self, color, rect=None):
+        """Fill the frame, or one rect of it, with a color."""
+        raise NotImplementedError
+
+    def blit(self, source, dest):
+        """
+        Draw a surface.
+        Args:
+            source (pygame.Surface): The surface to draw.
+            dest (tuple): Top-left position.
+        Returns:
+            pygame.Rect: The area drawn.
+        """
+        raise NotImplementedError
+
+    def blits(self, sequence):
+        """
+        Draw many surfaces, e.g. a swarm of ship sprites.
+        Args:
+            sequence (iterable): (source, dest) pairs, as for blit.
+        """
+        for source, dest in sequence:
+            self.blit(source, dest)
+
+    def draw_stars(self, positions, radii, color=STAR_COLOR):
+        """
+        Draw a batch of same-colored filled circles.
+        Args:
+            positions (numpy.ndarray): (N, 2) centers.
+            radii (numpy.ndarray): (N,) integer radii.
+            color (tuple): Circle color.
+        """
+        raise NotImplementedError
+
+    def draw_circles(self, centers, radii, colors):
+        """
+        Draw filled circles of their own colors, in order.
+        Args:
+            centers (numpy.ndarray): (N, 2) integer centers.
+            radii (numpy.ndarray): (N,) integer radii.
+            colors (numpy.ndarray): (N, 3) RGB colors.
+        """
+        raise NotImplementedError
+
+    def draw_lines(self, lines, color, width=1):
+        """
+        Draw line segments.
+        Args:
+            lines (list of tuple): (start, end) point pairs.
+            color (tuple): Line color.
+            width (int): Line thickness.
+        Returns:
+            pygame.Rect: The area drawn.
+        """
+        raise NotImplementedError
+
+    def present(self, overlay=None):
+        """
+        Show the finished frame.
+        Args:
+            overlay (callable, optional): Draws on top of the frame at display resolution, after
+                a scaled frame is scaled up, e.g. the profiler HUD. It is called with something
+                that has blit.
+        """
+        raise NotImplementedError
+
+class SurfaceBackend(RenderBackend):
+    """Draws on the display surface, or a smaller one scaled up on present, with CPU blits."""
+
+    name = "surface"
+    supports_dirty_rects = True
+
+    def __init__(self, size, title, fullscreen=False):
+        super().__init__(size)
+        self.display = pygame.display.set_mode(size, pygame.FULLSCREEN if fullscreen else 0)
+        pygame.display.set_caption(title)
+        self.screen = self.display  # What is drawn on
+        self.render_surfaces = {}  # Render scale -> offscreen surface, kept for when the scale returns
+        self.star_renderer = StarRenderer()
+
+    def set_scale(self, scale):
+        if scale == self.scale:
+            return
+        self.scale = scale
+        if scale == 1.0:
+            self.screen = self.display
+        else:
+            surface = self.render_surfaces.get(scale)
+            if surface is None:
+                surface = self.render_surfaces[scale] = pygame.Surface(self.get_size(), 0, self.display)
+            self.screen = surface
+
+    def create_surface(self, size):
+        return pygame.Surface(size, 0, self.display)
+
+    def fill(self, color, rect=None):
+        return self.screen.fill(color, rect)
+
+    def blit(self, source, dest):
+        return self.screen.blit(source, dest)
+
+    def blits(self, sequence):
+        self.screen.blits(sequence, doreturn=False)
+
+    def draw_stars(self, positions, radii, color=STAR_COLOR):
+        self.star_renderer.draw(self.screen, positions, radii, color)
+
+    def draw_circles(self, centers, radii, colors):
+        screen = self.screen
+        for center, color, radius in zip(centers.tolist(), colors.tolist(), radii.tolist()):
+            pygame.draw.circle(screen, color, center, radius)
+
+    def draw_lines(self, lines, color, width=1):
+        drawn = [pygame.draw.line(self.screen, color, start, end, width) for start, end in lines]
+        return drawn[0].unionall(drawn[1:])
+
+    def present(self, overlay=None):
+        if self.scale != 1.0:
+            # Nearest-neighbour keeps the pixel-art ship crisp and is several times cheaper than smoothscale
+            pygame.transform.scale(self.screen, self.size, self.display)
+        if overlay is not None:
+            overlay(self.display)
+        pygame.display.flip()
+
+class TextureBackend(RenderBackend):
+    """
+    Draws with an SDL renderer, through pygame._sdl2.video. Stars, bullets and cached
+    surfaces such as the ship sprites are uploaded as textures once and drawn as
+    textured copies, which the GPU does when SDL has an accelerated driver. Without
+    one SDL's software renderer does the same work on the CPU, so the backend also
+    runs, and can be tested, headless.
+    """
+
+    name = "texture"
+
+    def __init__(self, size, title, fullscreen=False):
+        from pygame._sdl2 import video
+
+        super().__init__(size)
+        self.video = video
+        # A renderer owns its window, so this replaces pygame.display.set_mode
+        self.window = video.Window(title, size=size, fullscreen=fullscreen)
+        try:
+            self.renderer = video.Renderer(self.window, accelerated=1)
+            self.accelerated = True
+        except video.error:
+            self.renderer = video.Renderer(self.window, accelerated=0)
+            self.accelerated = False
+        self.canvas = None  # Target texture while drawing below full resolution
+        self.canvases = {}  # Render scale -> target texture, kept for when the scale returns
+        self.star_renderer = StarRenderer()  # Rasterizes the stamps that are uploaded
+        self.stamps = {}  # (radius, color) -> Texture
+        self.tinted_stamps = {}  # radius -> white Texture recolored per draw
+        self.textures = weakref.WeakKeyDictionary()  # Blitted surface -> Texture
+
+    def set_scale(self, scale):
+        if scale == self.scale:
+            return
+        self.scale = scale
+        if scale == 1.0:
+            self.canvas = None
+        else:
+            canvas = self.canvases.get(scale)
+            if canvas is None:
+                canvas = self.canvases[scale] = self.video.Texture(self.renderer, self.get_size(), target=True)
+            self.canvas = canvas
+        self.renderer.target = self.canvas
+
+    def refresh(self, surface):
+        self.textures.pop(surface, None)
+
+    def stamp(self, radius, color):
+        """Texture of a circle matching pygame.draw.circle, uploaded on first use."""
+        key = (radius, color)
+        texture = self.stamps.get(key)
+        if texture is None:
+            stamp = self.star_renderer.stamp(radius, color)
+            texture = self.stamps[key] = self.video.Texture.from_surface(self.renderer, stamp)
+        return texture
+
+    def tinted_stamp(self, radius):
+        """White circle texture for drawing with a color modulation; never shared with stamp()."""
+        texture = self.tinted_stamps.get(radius)
+        if texture is None:
+            stamp = self.star_renderer.stamp(radius, (255, 255, 255))
+            texture = self.tinted_stamps[radius] = self.video.Texture.from_surface(self.renderer, stamp)
+        return texture
+
+    def fill(self, color, rect=None):
+        renderer = self.renderer
+        renderer.draw_color = pygame.Color(color)
+        if rect is None:
+            renderer.clear()
+        else:
+            renderer.fill_rect(rect)
+
+    def blit(self, source, dest):
+        texture = self.textures.get(source)
+        if texture is None:
+            texture = self.textures[source] = self.video.Texture.from_surface(self.renderer, source)
+        rect = pygame.Rect(dest, source.get_size())
+        texture.draw(dstrect=rect)
+        return rect
+
+    def draw_stars(self, positions, radii, color=STAR_COLOR):
+        corners = positions.astype(np.int32) - radii[:, None]
+        for radius in np.unique(radii).tolist():
+            draw = self.stamp(radius, color).draw
+            side = 2 * radius + 1
+            for x, y in corners[radii == radius].tolist():
+                draw(dstrect=(x, y, side, side))
+
+    def draw_circles(self, centers, radii, colors):
+        # One white stamp per radius, tinted per circle with the texture's color modulation
+        corners = (centers - radii[:, None]).tolist()
+        for (x, y), color, radius in zip(corners, colors.tolist(), radii.tolist()):
+            texture = self.tinted_stamp(radius)
+            texture.color = color
+            side = 2 * radius + 1
+            texture.draw(dstrect=(x, y, side, side))
+
+    def draw_lines(self, lines, color, width=1):
+        renderer = self.renderer
+        renderer.draw_color = pygame.Color(color)
+        # SDL lines are one pixel wide; thicken them across their minor axis like pygame.draw.line
+        shifts = range(-((width - 1) // 2), width - (width - 1) // 2)
+        points = []
+        for (x1, y1), (x2, y2) in lines:
+            steep = abs(y2 - y1) > abs(x2 - x1)
+            for shift in shifts:
+                if steep:
+                    renderer.draw_line((x1 + shift, y1), (x2 + shift, y2))
+                else:
+                    renderer.draw_line((x1, y1 + shift), (x2, y2 + shift))
+            points.extend(((x1, y1), (x2, y2)))
+        xs, ys = zip(*points)
+        low = (width - 1) // 2
+        return pygame.Rect(min(xs) - low, min(ys) - low, max(xs) - min(xs) + width, max(ys) - min(ys) + width)
+
+    def present(self, overlay=None):
+        renderer = self.renderer
+        if self.canvas is not None:
+            # SDL scales nearest-neighbour unless told otherwise, like the surface backend
+            renderer.target = None
+            self.canvas.draw()
+        if overlay is not None:
+            overlay(self)
+        renderer.present()
+        if self.canvas is not None:
+            renderer.target = self.canvas
+
+# Backend name -> class
+RENDER_BACKENDS = {backend.name: backend for backend in (SurfaceBackend, TextureBackend)}
+
+def create_backend(name, size, title, fullscreen=False):
+    """
+    Open the display through a named backend. When the texture backend can't start,
+    e.g. on a pygame built without SDL2 video support, the surface backend is used.
+    Args:
+        name (str): A RENDER_BACKENDS key.
+        size (tuple): Display size in pixels.
+        title (str): Window caption.
+        fullscreen (bool): Open a fullscreen window.
+    Returns:
+        RenderBackend: The backend drawing the frames.
+    """
+    backend = RENDER_BACKENDS[name]
+    if backend is not SurfaceBackend:
+        try:
+            return backend(size, title, fullscreen)
+        except (ImportError, RuntimeError, pygame.error):
+            pass  # pygame._sdl2 raises its own RuntimeError subclass
+    return SurfaceBackend(size, title, fullscreen)
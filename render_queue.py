@@ -0,0 +1,155 @@
+import numpy as np
+from constants import MIN_DEPTH, BULLET_MAX_DEPTH, STAR_COLOR, BULLET_OUTWARD, RENDER_DEPTH_LAYERS
+
+# Bands are drawn in this order; depth layers order entities within a band
+BAND_WORLD = 0       # Stars and bullets travelling with the world
+BAND_SHIP = 1        # The player's ship
+BAND_FOREGROUND = 2  # Outward bullets, which fly toward the viewer over the ship
+BAND_OVERLAY = 3     # Markers such as the target box
+
+class RenderQueue:
+    """
+    Collects a frame's stars, bullets and one-off draw calls and replays them in
+    painter's order. Entities are bucketed into quantized depth layers and ordered
+    with a radix sort on the integer layer keys, so ordering is O(n).
+    """
+
+    def __init__(self, layers=RENDER_DEPTH_LAYERS, min_depth=MIN_DEPTH, max_depth=BULLET_MAX_DEPTH):
+        self.layers = layers
+        # Layers are spaced evenly in parallax scale (1 / depth), where on-screen size changes fastest
+        self.near_scale = 1.0 / min_depth
+        self.far_scale = 1.0 / max_depth
+        self.clear()
+
+    def clear(self):
+        """Drop everything queued for the previous frame."""
+        self.star_positions = None
+        self.star_radii = None
+        self.star_keys = np.zeros(0, dtype=np.uint16)
+        self.star_color = STAR_COLOR
+        self.bullet_pool = None
+        self.bullet_positions = None
+        self.bullet_scale = 1.0
+        self.bullet_indices = np.zeros(0, dtype=np.intp)
+        self.bullet_keys = np.zeros(0, dtype=np.uint16)
+        self.calls = []  # (key, submission order, callable)
+
+    def layer_keys(self, depths, band=BAND_WORLD):
+        """Sort keys for depths: far layers first, bands in draw order."""
+        span = self.near_scale - self.far_scale
+        layers = ((1.0 / depths - self.far_scale) * (self.layers / span)).astype(np.int32)
+        np.clip(layers, 0, self.layers - 1, out=layers)
+        return (np.asarray(band) * self.layers + layers).astype(np.uint16)
+
+    def submit_stars(self, positions, radii, depths, color=STAR_COLOR):
+        """Queue a star batch from its position, radius and depth arrays."""
+        self.star_positions = positions
+        self.star_radii = radii
+        self.star_keys = self.layer_keys(depths)
+        self.star_color = color
+
+    def submit_bullets(self, pool, positions=None, scale=1.0):
+        """
+        Queue every live bullet in a BulletPool; outward bullets go in front of the ship.
+        Args:
+            pool (BulletPool): The bullets to draw.
+            positions (numpy.ndarray, optional): Per-slot positions to draw at instead of the pool's.
+            scale (float): Render resolution relative to the logical screen.
+        """
+        indices = np.flatnonzero(pool.alive)
+        bands = np.where(pool.kinds[indices] == BULLET_OUTWARD, BAND_FOREGROUND, BAND_WORLD)
+        self.bullet_pool = pool
+        self.bullet_positions = positions
+        self.bullet_scale = scale
+        self.bullet_indices = indices
+        self.bullet_keys = self.layer_keys(pool.depths[indices], bands)
+
+    def submit(self, draw, depth, band=BAND_WORLD):
+        """
+        Queue a single draw call.
+        Args:
+            draw (callable): Called with the RenderBackend drawing the frame.
+            depth (float): Depth used to place the call within its band.
+            band (int): One of the BAND_* constants.
+        """
+        key = int(self.layer_keys(np.array([depth]), band)[0])
+        self.calls.append((key, len(self.calls), draw))
+
+    def sort(self):
+        """
+        Order every queued entity by layer key.
+        Returns:
+            tuple: Star order and bullet order (both as positions into the submitted
+            arrays) and the sorted one-off calls. Star order is None when nothing
+            else lands among the star layers, as stars then need no ordering at all.
+        """
+        # NumPy's stable sort on 16-bit keys is a radix sort
+        bullet_order = np.argsort(self.bullet_keys, kind="stable")
+        calls = sorted(self.calls, key=lambda call: call[:2])
+
+        star_order = None
+        if len(self.star_keys):
+            nearest_star = self.star_keys.max()
+            interleaved = (self.bullet_keys < nearest_star).any() or any(call[0] < nearest_star for call in calls)
+            if interleaved:
+                star_order = np.argsort(self.star_keys, kind="stable")
+        return star_order, bullet_order, calls
+
+    def flush(self, target):
+        """
+        Draw everything queued, back to front, then clear the queue.
+        Args:
+            target (RenderBackend): What to draw through.
+        Returns:
+            list of pygame.Rect: Areas reported by the one-off draw calls.
+        """
+        star_order, bullet_order, calls = self.sort()
+        if star_order is None:
+            # Everything else is in front of the stars: draw them all first, unsorted
+            star_order = np.arange(len(self.star_keys))
+            star_keys = np.zeros(len(self.star_keys), dtype=np.uint16)
+        else:
+            star_keys = self.star_keys[star_order]
+        bullet_keys = self.bullet_keys[bullet_order]
+        bullet_order = self.bullet_indices[bullet_order]
+        call_keys = [call[0] for call in calls]
+
+        # Stars share a color, so their order among themselves doesn't matter: consecutive
+        # star-only layers are merged and drawn in one batch up to the next bullet or call.
+        boundaries = np.union1d(bullet_keys, call_keys).astype(np.uint16)
+        star_start = 0
+        bullet_start = 0
+        call_start = 0
+        drawn_rects = []
+        for key in boundaries.tolist():
+            star_end = int(np.searchsorted(star_keys, key, side="right"))
+            bullet_end = int(np.searchsorted(bullet_keys, key, side="right"))
+            call_end = call_start
+            while call_end < len(calls) and call_keys[call_end] == key:
+                call_end += 1
+
+            if star_end > star_start:
+                self._draw_stars(target, star_order[star_start:star_end])
+                star_start = star_end
+            if bullet_end > bullet_start:
+                self.bullet_pool.draw(
+                    target, bullet_order[bullet_start:bullet_end], self.bullet_positions, self.bullet_scale
+                )
+                bullet_start = bullet_end
+            for _, _, draw in calls[call_start:call_end]:
+                rect = draw(target)
+                if rect is not None:
+                    drawn_rects.append(rect)
+            call_start = call_end
+
+        if star_start < len(star_order):
+            self._draw_stars(target, star_order[star_start:])
+        self.clear()
+        return drawn_rects
+
+    def _draw_stars(self, target, indices):
+        if len(indices) == len(self.star_positions):
+            # The whole field in one go; skip the gather
+            target.draw_stars(self.star_positions, self.star_radii, self.star_color)
+        else:
+            target.draw_stars(self.star_positions[indices], self.star_radii[indices], self.star_color)
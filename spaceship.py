@@ -12,30 +12,96 @@ PIXEL_COLORS = {
 
 PIXEL_SIZE = 5
 
-def draw_spaceship(surface, matrix, position):
+class SpaceshipSprite:
+    """A pre-rendered spaceship surface with its size and centering offset."""
+
+    __slots__ = ("surface", "width", "height", "offset")
+
+    def __init__(self, surface):
+        self.surface = surface
+        self.width, self.height = surface.get_size()
+        self.offset = ((-self.width) // 2, (-self.height) // 2)  # Top-left relative to center
+
+    def position(self, center):
+        """Top-left blit position that centers the sprite on center."""
+        return (int(center[0]) + self.offset[0], int(center[1]) + self.offset[1])
+
+
+# Baked sprites keyed by (direction, scale, palette)
+_SPRITE_CACHE = {}
+
+def _palette_key(palette):
+    return tuple(sorted(palette.items())) if palette else None
+
+def rasterize_spaceship(matrix, palette=None):
     """
-    Draw the spaceship on the given surface based on the provided matrix and position.
+    Render a spaceship matrix into a new surface, one PIXEL_SIZE block per cell.
 
     Args:
-        surface (pygame.Surface): The surface to draw the spaceship on.
         matrix (list of list of int): The matrix representing the spaceship shape.
-        position (tuple of int): The (x, y) position to draw the spaceship.
+        palette (dict, optional): Overrides for PIXEL_COLORS, e.g. for palette swaps.
+
+    Returns:
+        pygame.Surface: A transparent surface holding the ship.
     """
-    x, y = position
+    colors = {**PIXEL_COLORS, **palette} if palette else PIXEL_COLORS
+    surface = pygame.Surface((len(matrix[0]) * PIXEL_SIZE, len(matrix) * PIXEL_SIZE), pygame.SRCALPHA)
     for row_index, row in enumerate(matrix):
         for col_index, pixel in enumerate(row):
-            if pixel in PIXEL_COLORS:
-                color = PIXEL_COLORS[pixel]
-                pygame.draw.rect(
-                    surface,
-                    color,
-                    (
-                        x + col_index * PIXEL_SIZE,
-                        y + row_index * PIXEL_SIZE,
-                        PIXEL_SIZE,
-                        PIXEL_SIZE,
-                    ),
+            if pixel in colors:
+                surface.fill(
+                    colors[pixel],
+                    (col_index * PIXEL_SIZE, row_index * PIXEL_SIZE, PIXEL_SIZE, PIXEL_SIZE),
                 )
+    return surface
+
+def get_spaceship_sprite(direction, scale=1, palette=None):
+    """
+    Fetch the baked sprite for a direction, rasterizing it on first use.
+
+    Args:
+        direction (str): A SPACESHIP_SHAPES key; unknown keys fall back to "up".
+        scale (float): Size multiplier applied on top of PIXEL_SIZE.
+        palette (dict, optional): Overrides for PIXEL_COLORS.
+
+    Returns:
+        SpaceshipSprite: The cached sprite.
+    """
+    if direction not in SPACESHIP_SHAPES:
+        direction = "up"
+    key = (direction, scale, _palette_key(palette))
+    sprite = _SPRITE_CACHE.get(key)
+    if sprite is None:
+        if scale == 1:
+            surface = rasterize_spaceship(SPACESHIP_SHAPES[direction], palette)
+        else:
+            base = get_spaceship_sprite(direction, 1, palette).surface
+            size = (max(1, round(base.get_width() * scale)), max(1, round(base.get_height() * scale)))
+            surface = pygame.transform.scale(base, size)
+        sprite = _SPRITE_CACHE[key] = SpaceshipSprite(surface)
+    return sprite
+
+def bake_spaceship_sprites(scale=1, palette=None):
+    """Rasterize every direction up front so the first frames don't pay for it."""
+    for direction in SPACESHIP_SHAPES:
+        get_spaceship_sprite(direction, scale, palette)
+
+def draw_spaceship(surface, direction, center, scale=1, palette=None):
+    """
+    Draw the spaceship centered on a position with a single blit.
+
+    Args:
+        surface (pygame.Surface or RenderBackend): Where to draw the spaceship.
+        direction (str): The facing, a SPACESHIP_SHAPES key.
+        center (tuple of int): The (x, y) position the ship is centered on.
+        scale (float): Size multiplier applied on top of PIXEL_SIZE.
+        palette (dict, optional): Overrides for PIXEL_COLORS.
+
+    Returns:
+        pygame.Rect: The area that was drawn.
+    """
+    sprite = get_spaceship_sprite(direction, scale, palette)
+    return surface.blit(sprite.surface, sprite.position(center))
 
 
 RAW_SPACESHIP_SHAPES = {
@@ -0,0 +1,170 @@
+import math
+
+import numpy as np
+from constants import WIDTH, HEIGHT
+
+class SpatialGrid:
+    """
+    Uniform-grid index over 2D screen positions.
+    Items are bucketed by cell with a counting sort, so a rebuild is O(N) and a
+    query only looks at the few cells its search circle overlaps. Items can also be
+    split into layers (e.g. depth slabs); each layer is a full grid of its own.
+    """
+
+    def __init__(self, cell_size=32, width=WIDTH, height=HEIGHT, layers=1):
+        self.cell_size = cell_size
+        self.columns = max(1, math.ceil(width / cell_size))
+        self.rows = max(1, math.ceil(height / cell_size))
+        self.cells = self.columns * self.rows  # Cells per layer
+        self.layers = layers
+        self.positions = np.zeros((0, 2))
+        self.offset = np.zeros(2)
+        self.radii = np.zeros(0)
+        self.max_radius = 0.0
+        self.order = np.zeros(0, dtype=np.intp)  # Item indices grouped by cell, ascending within a cell
+        # One bucket per cell of every layer, then one for items well off the grid
+        self.starts = np.zeros(self.layers * self.cells + 2, dtype=np.intp)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def cell_ids(self, positions):
+        """Flat cell index of each position, clamped onto the grid."""
+        # Truncation only differs from floor below zero, where the clamp catches it anyway
+        cells = (positions * (1.0 / self.cell_size)).astype(np.int32)
+        np.clip(cells, 0, (self.columns - 1, self.rows - 1), out=cells)
+        return cells[:, 1] * self.columns + cells[:, 0]
+
+    def rebuild(self, positions, radii=None, offset=(0.0, 0.0), layers=None):
+        """
+        Re-index a set of items.
+        Args:
+            positions (numpy.ndarray): (N, 2) positions; the grid keeps a reference, not a copy.
+            radii (numpy.ndarray, optional): (N,) extent of each item, used by query_point.
+            offset (tuple): Shift that places positions on the grid, e.g. a camera offset
+                for world positions. Queries use the same unshifted coordinates as positions.
+            layers (numpy.ndarray, optional): (N,) layer of each item, below self.layers.
+        """
+        self.positions = positions
+        self.offset = np.array(offset, dtype=float)
+        self.radii = radii if radii is not None else np.zeros(len(positions))
+        self.max_radius = float(self.radii.max()) if len(self.radii) else 0.0
+
+        grid_positions = positions + self.offset if self.offset.any() else positions
+        cells = self.cell_ids(grid_positions)
+        if layers is not None:
+            cells += layers.astype(cells.dtype) * self.cells
+        # Items more than a cell outside the grid can't reach it; park them where no query looks
+        size = self.cell_size
+        outside = (
+            (grid_positions[:, 0] < -size) | (grid_positions[:, 0] >= (self.columns + 1) * size)
+            | (grid_positions[:, 1] < -size) | (grid_positions[:, 1] >= (self.rows + 1) * size)
+        )
+        cells[outside] = self.layers * self.cells
+        # Cell ids fit in 16 bits for any sane grid, where NumPy's stable sort is a radix sort
+        sortable = cells.astype(np.uint16) if len(self.starts) <= 0x10000 else cells
+        self.order = np.argsort(sortable, kind="stable")
+        counts = np.bincount(cells, minlength=self.layers * self.cells + 1)
+        self.starts[0] = 0
+        np.cumsum(counts, out=self.starts[1:])
+
+    def candidates(self, position, reach):
+        """Indices of every item in the cells within reach of position, in ascending order."""
+        x, y = position[0] + self.offset[0], position[1] + self.offset[1]
+        size = self.cell_size
+        column_start = max(0, int((x - reach) // size))
+        column_end = min(self.columns - 1, int((x + reach) // size))
+        row_start = max(0, int((y - reach) // size))
+        row_end = min(self.rows - 1, int((y + reach) // size))
+        if column_start > column_end or row_start > row_end:
+            return np.zeros(0, dtype=np.intp)
+
+        # Cells in one grid row are contiguous in the sorted order
+        slices = [
+            self.order[self.starts[base + column_start]:self.starts[base + column_end + 1]]
+            for layer in range(self.layers)
+            for base in range(layer * self.cells + row_start * self.columns,
+                              layer * self.cells + (row_end + 1) * self.columns, self.columns)
+        ]
+        return np.sort(np.concatenate(slices))
+
+    def query_pairs(self, positions, reaches, layer_start=None, layer_end=None):
+        """
+        Broad phase for many queries at once, without a Python loop per query.
+        Args:
+            positions (numpy.ndarray): (M, 2) query centers, in the same coordinates as the items.
+            reaches (numpy.ndarray): (M,) search distance of each query.
+            layer_start (numpy.ndarray, optional): (M,) first layer each query looks in.
+            layer_end (numpy.ndarray, optional): (M,) last layer each query looks in, inclusive.
+        Returns:
+            tuple of numpy.ndarray: Query index and item index of every item in the cells
+            each query's bounding box overlaps.
+        """
+        scale = 1.0 / self.cell_size
+        x = positions[:, 0] + self.offset[0]
+        y = positions[:, 1] + self.offset[1]
+        column_start = np.floor((x - reaches) * scale)
+        column_end = np.floor((x + reaches) * scale)
+        row_start = np.floor((y - reaches) * scale)
+        row_end = np.floor((y + reaches) * scale)
+        on_grid = (column_end >= 0) & (column_start < self.columns) & (row_end >= 0) & (row_start < self.rows)
+        if layer_start is None:
+            layer_start = np.zeros(len(positions), dtype=np.intp)
+            layer_end = np.full(len(positions), self.layers - 1, dtype=np.intp)
+        else:
+            on_grid &= (layer_end >= 0) & (layer_start < self.layers) & (layer_start <= layer_end)
+            layer_start = np.clip(layer_start, 0, self.layers - 1).astype(np.intp)
+            layer_end = np.clip(layer_end, 0, self.layers - 1).astype(np.intp)
+        column_start = np.clip(column_start, 0, self.columns - 1).astype(np.intp)
+        column_end = np.clip(column_end, 0, self.columns - 1).astype(np.intp)
+        row_start = np.clip(row_start, 0, self.rows - 1).astype(np.intp)
+        row_end = np.clip(row_end, 0, self.rows - 1).astype(np.intp)
+
+        # One (query, layer, row) span per grid row a query covers; cells in a row are contiguous
+        row_counts = row_end - row_start + 1
+        span_counts = np.where(on_grid, (layer_end - layer_start + 1) * row_counts, 0)
+        span_queries = np.repeat(np.arange(len(positions)), span_counts)
+        layer_rows, rows = np.divmod(_ramp(span_counts), row_counts[span_queries])
+        row_bases = (layer_start[span_queries] + layer_rows) * self.cells + (row_start[span_queries] + rows) * self.columns
+        begins = self.starts[row_bases + column_start[span_queries]]
+        lengths = self.starts[row_bases + column_end[span_queries] + 1] - begins
+
+        pair_queries = np.repeat(span_queries, lengths)
+        pair_items = self.order[np.repeat(begins, lengths) + _ramp(lengths)]
+        return pair_queries, pair_items
+
+    def query_point(self, position, radius=0.0):
+        """
+        Find the topmost item covering a point.
+        Args:
+            position (Vector2 or tuple): The point to test.
+            radius (float): Extra tolerance added to every item's own radius.
+        Returns:
+            int or None: The highest-index (last drawn) item whose extent reaches the point.
+        """
+        indices = self.candidates(position, radius + self.max_radius)
+        if not len(indices):
+            return None
+        offsets = self.positions[indices] - (position[0], position[1])
+        distances = np.hypot(offsets[:, 0], offsets[:, 1])
+        hits = indices[distances <= self.radii[indices] + radius]
+        return int(hits[-1]) if len(hits) else None
+
+    def query_radius(self, position, radius):
+        """
+        Find every item whose position lies within a circle.
+        Args:
+            position (Vector2 or tuple): Center of the search circle.
+            radius (float): Radius of the search circle.
+        Returns:
+            numpy.ndarray: Matching item indices in ascending order.
+        """
+        indices = self.candidates(position, radius)
+        offsets = self.positions[indices] - (position[0], position[1])
+        return indices[np.hypot(offsets[:, 0], offsets[:, 1]) <= radius]
+
+def _ramp(counts):
+    """0, 1, ..., count - 1 for each count, concatenated."""
+    total = int(counts.sum())
+    starts = np.repeat(np.cumsum(counts) - counts, counts)
+    return np.arange(total) - starts
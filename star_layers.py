@@ -0,0 +1,164 @@
+import numpy as np
+import pygame
+from constants import WIDTH, HEIGHT, STAR_COLOR, STAR_LAYER_MIN_DEPTH, STAR_LAYER_PADDING, STAR_LAYER_MIN_TICKS
+from render_queue import BAND_WORLD
+
+class StarLayer:
+    """One far band's stars, pre-rendered onto an offscreen surface."""
+
+    __slots__ = ("surface", "origin", "reach", "block", "sign", "depth", "position")
+
+    def __init__(self):
+        self.surface = None
+        self.origin = np.zeros(2)  # Band-space (sign * plane) coordinates of the surface's corner
+        self.reach = 0  # Largest star radius on the surface, in logical pixels
+        self.block = None  # The BandBlock that was rendered, to notice sectors coming and going
+        self.sign = 0.0
+        self.depth = 0.0
+        self.position = None  # Where the surface was last blitted
+
+    def draw(self, target):
+        # No rect: the layer is either unchanged on screen or the frame is redrawn in full
+        target.blit(self.surface, self.position)
+
+class StarLayers:
+    """
+    Draws the far depth bands of a StarField from cached layer surfaces.
+    A band's stars keep their places relative to one another; only the band's offset
+    and sign change as it scrolls and wraps. Each far band is therefore rendered once
+    into a surface a little larger than the screen and blitted at the band's offset
+    every frame. A layer is re-rendered only when what it shows changes: its sectors
+    stream in or out, it wraps in depth (which inverts it), its depth changes (which
+    resizes its stars), or it scrolls past its padding. A band whose layer would be
+    re-rendered every few ticks, because it scrolls fast (e.g. during a slingshot
+    boost) or keeps changing depth (e.g. while zooming toward a target), is drawn
+    star by star instead.
+    """
+
+    def __init__(self, field, min_depth=STAR_LAYER_MIN_DEPTH, padding=STAR_LAYER_PADDING):
+        """
+        Args:
+            field (StarField): The field whose bands are layered.
+            min_depth (float): Bands at or beyond this depth are drawn as layers.
+            padding (int): Pixels a layer extends past each screen edge, i.e. how far it can
+                scroll before it is re-rendered.
+        """
+        self.field = field
+        self.min_depth = min_depth
+        self.padding = padding
+        self.size = (WIDTH + 2 * padding, HEIGHT + 2 * padding)  # Logical pixels
+        self.scale = 1.0  # Render resolution relative to the logical screen
+        bands = len(field.band_depths)
+        self.layers = [StarLayer() for _ in range(bands)]
+        self.active = np.zeros(bands, dtype=bool)  # Bands drawn as layers this frame
+        self.moved = True  # Whether any layer changed on screen this frame
+
+    def set_scale(self, scale):
+        """Render the layers at a new resolution, relative to the logical screen."""
+        if scale != self.scale:
+            self.scale = scale
+            for layer in self.layers:
+                layer.surface = None
+
+    def prepare(self, target, alpha=1.0):
+        """
+        Bring the layers up to date for a frame and work out where they go.
+        Args:
+            target (RenderBackend): What the layers will be drawn through.
+            alpha (float): How far between the previous and the latest simulation tick to draw.
+        Returns:
+            numpy.ndarray: (bands,) mask of the bands drawn as layers, whose stars must be
+            left out of the per-star draw.
+        """
+        field = self.field
+        camera = field.camera
+        previous = self.active
+        scroll = field.placed_offsets - field.previous_band_offsets
+        flipped = field.previous_band_signs != field.placed_signs
+        scroll[flipped] = 0.0
+        # A band changing depth, e.g. while zooming toward a target, would need a new layer
+        # every tick, as would one scrolling past its padding within a few ticks
+        self.active = (
+            (field.placed_depths >= self.min_depth)
+            & (field.placed_depths == field.previous_band_depths)
+            & (np.hypot(scroll[:, 0], scroll[:, 1]) * STAR_LAYER_MIN_TICKS < self.padding)
+        )
+        if camera.zoom != 1.0:
+            # Zoom would mean scaling every layer each frame; draw stars one by one instead
+            self.active[:] = False
+        self.moved = bool((self.active != previous).any())
+
+        # Band offsets interpolated the way the star positions are; a wrap jumps straight there
+        offsets = field.previous_band_offsets + scroll * alpha
+        offsets[flipped] = field.placed_offsets[flipped]
+        shifts = offsets + camera.interpolated_offset(alpha)  # Band space to screen
+
+        for band in np.flatnonzero(self.active).tolist():
+            layer = self.layers[band]
+            shift = shifts[band]
+            if self.stale(layer, band, shift):
+                self.render(layer, band, shift, target)
+                self.moved = True
+            position = tuple(np.floor((layer.origin + shift) * self.scale).astype(int).tolist())
+            if position != layer.position:
+                layer.position = position
+                self.moved = True
+        return self.active
+
+    def stale(self, layer, band, shift):
+        """Whether a layer no longer matches its band or no longer covers the screen."""
+        field = self.field
+        if (
+            layer.surface is None or layer.block is not field.band_blocks[band]
+            or layer.sign != field.placed_signs[band] or layer.depth != field.placed_depths[band]
+        ):
+            return True
+        # Every star that touches the screen has to be whole on the surface
+        low = -shift - layer.origin
+        high = low + (WIDTH, HEIGHT)
+        return low.min() < layer.reach or (self.size - high).min() < layer.reach
+
+    def render(self, layer, band, shift, target):
+        """Draw a band's stars around the current view onto its layer surface."""
+        field = self.field
+        stars = field.band_slices(np.arange(len(self.layers)) == band)[0]
+        sign = field.placed_signs[band]
+        layer.origin = np.floor(-shift) - self.padding
+        layer.block = field.band_blocks[band]
+        layer.sign = sign
+        layer.depth = field.placed_depths[band]
+
+        # Stars that wrapped in depth on their own move against the band; they are drawn one by one
+        stars = np.arange(stars.start, stars.stop)[~field.wrapped[stars]]
+        local = field.plane_positions[stars] * sign - layer.origin
+        radii = np.maximum(1, (field.sizes[stars] / field.depths[stars]).astype(np.int32))
+        width, height = self.size
+        scale = self.scale
+        if scale != 1.0:
+            # Stars are placed in logical pixels, then drawn the way Game.draw scales them
+            local = local * scale
+            radii = np.maximum(1, (radii * scale + 0.5).astype(np.int32))
+            width, height = int(width * scale), int(height * scale)
+        layer.reach = int(np.ceil(radii.max() / scale)) if len(radii) else 0  # In logical pixels
+        inside = (
+            (local[:, 0] >= radii) & (local[:, 0] + radii < width)
+            & (local[:, 1] >= radii) & (local[:, 1] + radii < height)
+        )
+
+        surface = layer.surface
+        if surface is None:
+            surface = layer.surface = target.create_surface((width, height))
+        # Unlike the renderer's solid stamps, a layer is mostly colorkey, so RLE pays off here: skipping the
+        # empty runs blits a layer 4-25x faster. Encoding costs about five plain blits, once per render,
+        # and a layer lasts at least STAR_LAYER_MIN_TICKS
+        colorkey = (0, 0, 0) if STAR_COLOR != (0, 0, 0) else (255, 255, 255)
+        surface.set_colorkey(None)
+        surface.fill(colorkey)
+        field.renderer.draw(surface, local[inside], radii[inside], STAR_COLOR)
+        surface.set_colorkey(colorkey, pygame.RLEACCEL)
+        target.refresh(surface)
+
+    def submit(self, queue):
+        """Queue a blit of every active layer at its band's depth."""
+        for band in np.flatnonzero(self.active).tolist():
+            queue.submit(self.layers[band].draw, float(self.field.placed_depths[band]), BAND_WORLD)
@@ -0,0 +1,150 @@
+from itertools import repeat
+
+import numpy as np
+import pygame
+from constants import STAR_COLOR
+
+# Stars up to this radius are written straight into the pixel buffer; bigger ones are blitted
+POINT_STAR_MAX_RADIUS = 2
+# Bigger stars covering this many surfaces' worth of pixels, overlaps counted, are filled as one
+# coverage mask instead: blits repaint every overlap, which dominates in dense fields
+DENSE_STAR_COVERAGE = 8.0
+
+class StarRenderer:
+    """
+    Draws many stars at once from position and radius arrays.
+    Small stars are scattered into the pixel buffer with NumPy, larger ones are
+    blitted from pre-rendered circle stamps in a single Surface.blits call, or, when
+    they overlap many times over, filled as the union of their pixel rows.
+    """
+
+    def __init__(self):
+        self.stamps = {}  # (radius, color) -> pygame.Surface
+        self.offsets = {}  # radius -> (dx, dy) arrays of the pixels a circle covers
+        self.spans = {}  # radius -> (dy, first dx, last dx) arrays of a circle's pixel rows
+
+    def stamp(self, radius, color=STAR_COLOR):
+        """Pre-rendered circle matching pygame.draw.circle at the given radius."""
+        key = (radius, color)
+        stamp = self.stamps.get(key)
+        if stamp is None:
+            # Colorkeyed stamps blit several times faster than per-pixel alpha. A circle is
+            # mostly solid, so RLE only adds per-run overhead: it is up to 2.5x slower here
+            colorkey = (0, 0, 0) if color != (0, 0, 0) else (255, 255, 255)
+            stamp = pygame.Surface((2 * radius + 1, 2 * radius + 1))
+            stamp.fill(colorkey)
+            pygame.draw.circle(stamp, color, (radius, radius), radius)
+            stamp.set_colorkey(colorkey)
+            self.stamps[key] = stamp
+        return stamp
+
+    def circle_offsets(self, radius):
+        """Pixel offsets, relative to the center, that a circle of this radius covers."""
+        offsets = self.offsets.get(radius)
+        if offsets is None:
+            dx, dy = np.nonzero(pygame.surfarray.array_colorkey(self.stamp(radius)))
+            offsets = self.offsets[radius] = (dx - radius, dy - radius)
+        return offsets
+
+    def row_spans(self, radius):
+        """Rows of a circle of this radius, relative to the center, with each row's first and last pixel."""
+        spans = self.spans.get(radius)
+        if spans is None:
+            dx, dy = self.circle_offsets(radius)
+            rows, row_of = np.unique(dy, return_inverse=True)
+            first = np.full(len(rows), radius)
+            last = np.full(len(rows), -radius)
+            np.minimum.at(first, row_of, dx)
+            np.maximum.at(last, row_of, dx)
+            spans = self.spans[radius] = (rows, first, last)
+        return spans
+
+    def draw(self, surface, positions, radii, color=STAR_COLOR):
+        """
+        Draw a batch of stars.
+        Args:
+            surface (pygame.Surface): The Pygame surface to draw on.
+            positions (numpy.ndarray): (N, 2) screen positions.
+            radii (numpy.ndarray): (N,) integer radii.
+            color (tuple): Star color.
+        """
+        centers = positions.astype(np.int32)
+        small = radii <= POINT_STAR_MAX_RADIUS
+        if small.any():
+            self.draw_points(surface, centers[small], radii[small], color)
+
+        large = ~small
+        if large.any():
+            centers, radii = centers[large], radii[large]
+            width, height = surface.get_size()
+            if np.dot(radii, radii) * np.pi >= DENSE_STAR_COVERAGE * width * height:
+                self.draw_coverage(surface, centers, radii, color)
+            else:
+                self.draw_stamps(surface, centers, radii, color)
+
+    def draw_stamps(self, surface, centers, radii, color):
+        """Blit circle stamps for a batch of stars, grouped by radius, in one Surface.blits call."""
+        order = np.argsort(radii.astype(np.uint16), kind="stable")
+        radii = radii[order]
+        corners = centers[order] - radii[:, None]
+        starts = np.flatnonzero(np.diff(radii)) + 1
+        blits = []
+        for radius, group in zip(radii[np.r_[0, starts]].tolist(), np.split(corners, starts)):
+            blits.extend(zip(repeat(self.stamp(radius, color)), group.tolist()))
+        surface.blits(blits, doreturn=False)
+
+    def draw_coverage(self, surface, centers, radii, color):
+        """
+        Fill the union of a batch of circles in one pass over the surface. Each circle
+        is cut into pixel rows; a row adds one at its first pixel and takes one away past
+        its last, so a running sum along every surface row counts the circles over each
+        pixel, however often they overlap.
+        """
+        try:
+            pixels = pygame.surfarray.pixels2d(surface)
+        except ValueError:
+            self.draw_stamps(surface, centers, radii, color)
+            return
+        width, height = surface.get_size()
+        stride = width + 1  # A column past the edge takes the ends of rows that reach it
+        order = np.argsort(radii.astype(np.uint16), kind="stable")
+        radii = radii[order]
+        splits = np.flatnonzero(np.diff(radii)) + 1
+        starts = []
+        ends = []
+        for radius, group in zip(radii[np.r_[0, splits]].tolist(), np.split(centers[order], splits)):
+            rows, first, last = self.row_spans(radius)
+            ys = (group[:, 1, None] + rows).ravel()
+            x_first = (group[:, 0, None] + first).ravel()
+            x_last = (group[:, 0, None] + last).ravel()
+            inside = (ys >= 0) & (ys < height) & (x_last >= 0) & (x_first < width)
+            row_starts = ys[inside] * stride
+            starts.append(row_starts + np.maximum(x_first[inside], 0))
+            ends.append(row_starts + np.minimum(x_last[inside], width - 1) + 1)
+        cells = height * stride
+        counts = np.bincount(np.concatenate(starts), minlength=cells)
+        counts -= np.bincount(np.concatenate(ends), minlength=cells)
+        covered = counts.reshape(height, stride).cumsum(axis=1)[:, :width] > 0
+        pixels.T[covered] = surface.map_rgb(color)
+        del pixels  # Unlock the surface
+
+    def draw_points(self, surface, centers, radii, color):
+        """Scatter small circles straight into the surface's pixel buffer."""
+        width, height = surface.get_size()
+        try:
+            pixels = pygame.surfarray.pixels2d(surface)
+        except ValueError:
+            # 24-bit and other packed formats can't be referenced as a 2D array
+            for (x, y), radius in zip(centers.tolist(), radii.tolist()):
+                pygame.draw.circle(surface, color, (x, y), radius)
+            return
+
+        mapped = surface.map_rgb(color)
+        for radius in np.unique(radii).tolist():
+            group = centers[radii == radius]
+            dx, dy = self.circle_offsets(radius)
+            xs = (group[:, 0, None] + dx).ravel()
+            ys = (group[:, 1, None] + dy).ravel()
+            inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+            pixels[xs[inside], ys[inside]] = mapped
+        del pixels  # Unlock the surface
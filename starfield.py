@@ -0,0 +1,513 @@
+import numpy as np
+from pygame.math import Vector2
+from constants import (
+    WIDTH, HEIGHT, MIN_DEPTH, STREAM_LOOKAHEAD, STREAM_PREFETCH_SECTORS,
+    STAR_LOD_INTERVALS, STAR_LOD_MAX_DRIFT,
+)
+from camera import Camera
+from star_layers import StarLayers
+from star_renderer import StarRenderer
+from streaming import SectorStreamer
+from universe import Universe
+from utils import interpolate_positions
+from topology import wrap_depths
+
+# Stars this far outside the view (px) stay materialized, so their edges still show
+VIEW_MARGIN = 32
+# Per-star arrays as (name, trailing shape, dtype); each is the front of a buffer with room to grow
+STAR_ARRAYS = (
+    ("bands", (), np.int64),
+    ("plane_positions", (2,), float),
+    ("depth_offsets", (), float),
+    ("sizes", (), np.int64),
+    ("velocities", (2,), float),
+    ("positions", (2,), float),
+    ("depths", (), float),
+    ("wrapped", (), bool),
+    ("previous_positions", (2,), float),
+)
+# Spare room a star buffer is grown with, as a share of the stars it has to hold
+STAR_BUFFER_HEADROOM = 0.25
+
+class StarField:
+    def __init__(self, count, rng=None, camera=None, streaming=False, lod_intervals=STAR_LOD_INTERVALS,
+                 lod_max_drift=STAR_LOD_MAX_DRIFT):
+        """
+        Initialize the stars around the player, stored as contiguous NumPy arrays.
+        Stars come from a sector-chunked Universe: every depth band is a plane that
+        scrolls with parallax, and only the sectors of each plane that overlap the view
+        are materialized into the arrays. Positions are in world space; the camera maps
+        them onto the screen.
+        Args:
+            count (int): Average number of stars on screen.
+            rng (numpy.random.Generator, optional): Random source the universe seed is drawn from.
+            camera (Camera, optional): The view that decides which sectors are needed.
+            streaming (bool): Generate sectors on worker threads ahead of the player instead of
+                on demand. Sectors that aren't ready yet stay empty until they arrive, so
+                which stars exist on a given tick depends on timing.
+            lod_intervals (tuple): (band depth, interval) pairs in ascending depth; a band's stars
+                are re-placed every interval ticks of the last pair at or below its depth.
+            lod_max_drift (float): Pixels a band may drift from where its stars were last placed
+                before they are re-placed off schedule.
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        self.camera = camera if camera is not None else Camera()
+        self.count = count
+        self.universe = Universe(int(rng.integers(0, 2 ** 63)), count)
+        self.renderer = StarRenderer()
+
+        # Per-band state: a star's world position is sign * plane position + offset
+        bands = self.universe.bands
+        self.band_depths = self.universe.band_centers.copy()
+        self.band_offsets = np.zeros((bands, 2))
+        self.band_signs = np.ones(bands)
+
+        # Temporal LOD: band state the stars were last placed with, which lags the true state
+        # of far bands by up to their interval, and under lod_max_drift pixels
+        self.lod_depths = np.array([depth for depth, _ in lod_intervals], dtype=float)
+        self.lod_intervals = np.array([interval for _, interval in lod_intervals], dtype=np.int64)
+        self.lod_max_drift = lod_max_drift
+        self.tick = 0
+        self.placed_depths = self.band_depths.copy()
+        self.placed_offsets = self.band_offsets.copy()
+        self.placed_signs = self.band_signs.copy()
+        self.placed_bands = np.ones(bands, dtype=bool)  # Bands re-placed on the last update
+        self.previous_band_offsets = self.placed_offsets.copy()
+        self.previous_band_signs = self.placed_signs.copy()
+        self.previous_band_depths = self.placed_depths.copy()
+        self.player_velocity = np.zeros(2)
+        self.drifted = np.zeros(bands, dtype=bool)  # Bands whose stars moved since their sectors were last updated
+
+        # Materialized sectors: one block of concatenated sectors per band, spliced into the star arrays
+        self.sectors = {}
+        self.band_ranges = np.full((bands, 4), -1, dtype=np.int64)  # Sector x/y start and end per band
+        self.band_blocks = [None] * bands
+        self.band_missing = [set() for _ in range(bands)]  # Keys in view still being generated
+        self.band_starts = np.zeros(bands, dtype=np.intp)  # Index of each band's first star
+        self.band_counts = np.zeros(bands, dtype=np.intp)
+        self.buffers = {name: np.zeros((0,) + shape, dtype) for name, shape, dtype in STAR_ARRAYS}
+        for name, buffer in self.buffers.items():
+            setattr(self, name, buffer)
+        self.streamer = None
+        self.materialize(self.visible_ranges())
+        everything = np.ones(bands, dtype=bool)
+        self.place(everything, everything)
+        np.copyto(self.previous_positions, self.positions)  # Positions at the start of the tick
+        self.layers = StarLayers(self)  # Cached surfaces the far bands are drawn from
+
+        # The first view is built synchronously; from here on sectors stream in
+        self.prefetch_ranges = self.band_ranges.copy()
+        if streaming:
+            self.streamer = SectorStreamer(self.universe)
+
+    def close(self):
+        """Stop the streaming workers, if any."""
+        if self.streamer is not None:
+            self.streamer.close()
+
+    def __len__(self):
+        return len(self.depths)
+
+    def __getitem__(self, index):
+        return StarView(self, index)
+
+    def visible_ranges(self, band_offsets=None):
+        """
+        Inclusive sector x and y ranges of each band that overlap the view.
+        Args:
+            band_offsets (numpy.ndarray, optional): Band offsets to use instead of the current ones.
+        Returns:
+            numpy.ndarray: (bands, 4) x start, x end, y start and y end.
+        """
+        band_offsets = self.band_offsets if band_offsets is None else band_offsets
+        view_low = -self.camera.offset - VIEW_MARGIN
+        view_high = (WIDTH, HEIGHT) - self.camera.offset + VIEW_MARGIN
+        # Invert world = sign * plane + offset over the view rectangle
+        signs = self.band_signs[:, None]
+        low = signs * (view_low - band_offsets)
+        high = signs * (view_high - band_offsets)
+        scale = 1.0 / self.universe.sector_size
+        start = np.floor(np.minimum(low, high) * scale).astype(np.int64)
+        end = np.floor(np.maximum(low, high) * scale).astype(np.int64)
+        return np.column_stack((start[:, 0], end[:, 0], start[:, 1], end[:, 1]))
+
+    def materialize(self, ranges, stale_bands=()):
+        """
+        Make the arrays hold exactly the sectors in the given ranges.
+        Only bands whose range changed are rebuilt. Sectors that drop out go to the
+        universe's cache; new ones are loaded from it, or generated in place unless
+        streaming, in which case the band is rebuilt again once they arrive.
+        Args:
+            ranges (numpy.ndarray): (bands, 4) sector ranges, see visible_ranges.
+            stale_bands (iterable of int): Bands to rebuild even if their range is the same.
+        Returns:
+            numpy.ndarray: Mask of the rebuilt bands, whose stars are left for the caller to place.
+        """
+        changed = (ranges != self.band_ranges).any(axis=1)
+        changed[list(stale_bands)] = True
+        if not changed.any():
+            return changed
+        moved = changed & self.drifted
+        if moved.any():
+            self.store_motion(moved)
+        universe = self.universe
+        streamer = self.streamer
+        for band in np.flatnonzero(changed).tolist():
+            x_start, x_end, y_start, y_end = ranges[band].tolist()
+            keys = [
+                (band, sector_x, sector_y)
+                for sector_x in range(x_start, x_end + 1)
+                for sector_y in range(y_start, y_end + 1)
+            ]
+            if self.band_blocks[band] is not None:
+                wanted = set(keys)
+                for key in self.band_blocks[band].keys:
+                    if key not in wanted:
+                        universe.release(self.sectors.pop(key))
+            missing = self.band_missing[band]
+            missing.clear()
+            for key in keys:
+                if key not in self.sectors:
+                    sector = universe.load(key) if streamer is None else streamer.take(key)
+                    if sector is None:
+                        missing.add(key)
+                        continue
+                    self.sectors[key] = sector
+            keys = [key for key in keys if key not in missing]
+            self.band_blocks[band] = BandBlock(keys, [self.sectors[key] for key in keys])
+        self.band_ranges[changed] = ranges[changed]
+        self.splice(changed)
+        return changed
+
+    def splice(self, changed):
+        """
+        Swap the rebuilt bands' blocks into the star arrays. Each array is the front of a
+        buffer with room to grow, holding the bands in order, far ones first. Only the
+        rebuilt bands and those that shift along after them are rewritten, so streaming
+        costs time in proportion to the bands it touches, which are mostly the near ones
+        at the end; every other band keeps its stars, placement and previous positions.
+        Args:
+            changed (numpy.ndarray): Mask of the rebuilt bands.
+        """
+        blocks = self.band_blocks
+        counts = np.array([len(block) for block in blocks], dtype=np.intp)
+        starts = np.cumsum(counts) - counts
+        total = int(counts.sum())
+        shift = starts - self.band_starts
+        moved = ~changed & (shift != 0)
+        # A band only ever lands where others shifting the same way were, so moving those shifting up
+        # from the end down and those shifting down from the start up never overwrites one still to go
+        order = np.r_[np.flatnonzero(moved & (shift > 0))[::-1], np.flatnonzero(moved & (shift < 0))].tolist()
+        moves = [
+            (slice(int(starts[band]), int(starts[band] + counts[band])),
+             slice(int(self.band_starts[band]), int(self.band_starts[band] + counts[band])))
+            for band in order
+        ]
+        for name, shape, dtype in STAR_ARRAYS:
+            array = getattr(self, name)
+            buffer = self.buffers[name]
+            if len(buffer) < total:
+                buffer = self.buffers[name] = np.empty((int(total * (1 + STAR_BUFFER_HEADROOM)),) + shape, dtype)
+                buffer[:len(array)] = array
+            for target, source in moves:
+                buffer[target] = buffer[source]
+            setattr(self, name, buffer[:total])
+        self.band_starts = starts
+        self.band_counts = counts
+
+        # Rebuilt bands' placement and previous positions are left for the caller
+        for band, stars in zip(np.flatnonzero(changed).tolist(), self.band_slices(changed)):
+            block = blocks[band]
+            self.bands[stars] = band
+            self.plane_positions[stars] = block.positions
+            self.depth_offsets[stars] = block.depth_offsets
+            self.sizes[stars] = block.sizes
+            self.velocities[stars] = block.velocities
+
+    def store_motion(self, mask):
+        """
+        Copy where the stars of the given bands have moved to (see accelerate) back into
+        their sectors, which are about to be rebuilt. The motion then survives the rebuild
+        and a sector's trip through the cache, though not its eviction. Other bands keep
+        theirs in the star arrays.
+        Args:
+            mask (numpy.ndarray): Bands whose sectors are updated.
+        """
+        for band, stars in zip(np.flatnonzero(mask).tolist(), self.band_slices(mask)):
+            positions = self.plane_positions[stars]
+            velocities = self.velocities[stars]
+            for key, start in self.band_blocks[band].starts.items():
+                sector = self.sectors[key]
+                sector.positions[...] = positions[start:start + len(sector)]
+                sector.velocities[...] = velocities[start:start + len(sector)]
+        self.drifted[mask] = False
+
+    def accelerate(self, accelerations, delta_time):
+        """
+        Move the stars within their band planes under outside forces, e.g. gravity.
+        Velocities are in world space, so a star in an inverted band moves the other way
+        across its plane. Stars reach their new positions when their band is next
+        re-placed, on its LOD schedule like any other motion.
+        Args:
+            accelerations (numpy.ndarray): (N, 2) acceleration of every star, in px / s^2.
+            delta_time (float): The tick length in seconds.
+        """
+        self.velocities += accelerations * delta_time
+        self.plane_positions += self.velocities * (self.band_signs[self.bands, None] * delta_time)
+        self.drifted[:] = True
+
+    def star_index(self, key, local):
+        """Index in the arrays of a sector's local-th star, or None if the sector isn't materialized."""
+        block = self.band_blocks[key[0]]
+        start = block.starts.get(key)
+        return None if start is None else int(self.band_starts[key[0]]) + start + local
+
+    def star_key(self, index):
+        """The sector key and local index of the star at an array index."""
+        band = int(self.bands[index])
+        block = self.band_blocks[band]
+        offset = int(index) - int(self.band_starts[band])
+        sector = int(np.searchsorted(block.offsets, offset, side="right")) - 1
+        key = block.keys[sector]
+        return key, offset - block.starts[key]
+
+    def band_slices(self, mask):
+        """Array slices of the stars of every band selected by a boolean mask."""
+        ends = self.band_starts + self.band_counts
+        return [slice(start, end) for start, end in zip(self.band_starts[mask].tolist(), ends[mask].tolist())]
+
+    def place(self, mask, depth_mask=None):
+        """
+        Derive world positions and depths from the placed band state.
+        Args:
+            mask (numpy.ndarray): Bands to re-place.
+            depth_mask (numpy.ndarray, optional): Bands whose star depths are recomputed too.
+        """
+        signs, offsets, depths = self.placed_signs, self.placed_offsets, self.placed_depths
+        # A star whose depth runs past an end of the range wraps on its own, like a whole band,
+        # and is inverted about the view center with its depth carried in from the other end
+        mirror = (WIDTH, HEIGHT) - 2 * self.camera.offset
+        if depth_mask is not None and depth_mask.any():
+            for band, stars in zip(np.flatnonzero(depth_mask).tolist(), self.band_slices(depth_mask)):
+                np.add(self.depth_offsets[stars], depths[band], out=self.depths[stars])
+                self.wrapped[stars] = wrap_depths(self.depths[stars], carry=True)
+        # Bands are contiguous in the arrays, so each one is a slice
+        for band, stars in zip(np.flatnonzero(mask).tolist(), self.band_slices(mask)):
+            positions = self.positions[stars]
+            np.multiply(self.plane_positions[stars], signs[band], out=positions)
+            positions += offsets[band]
+            wrapped = self.wrapped[stars]
+            if wrapped.any():
+                positions[wrapped] = mirror - positions[wrapped]
+
+    def due_bands(self):
+        """
+        Bands whose stars need re-placing this tick: those on their interval, those that
+        wrapped or changed depth, and those whose placement has drifted too far.
+        """
+        intervals = self.lod_intervals[np.searchsorted(self.lod_depths, self.band_depths, side="right") - 1]
+        due = (self.tick + np.arange(len(intervals))) % np.maximum(intervals, 1) == 0  # Staggered
+        due |= (self.band_signs != self.placed_signs) | (self.band_depths != self.placed_depths)
+        drift = self.band_offsets - self.placed_offsets
+        due |= np.hypot(drift[:, 0], drift[:, 1]) >= self.lod_max_drift
+        return due
+
+    def store_previous_positions(self):
+        """Remember where the stars are at the start of a simulation tick."""
+        # Bands left alone last tick haven't moved since the previous copy
+        placed = self.placed_bands
+        if placed.all():
+            np.copyto(self.previous_positions, self.positions)
+        else:
+            for stars in self.band_slices(placed):
+                self.previous_positions[stars] = self.positions[stars]
+        np.copyto(self.previous_band_offsets, self.placed_offsets)
+        np.copyto(self.previous_band_signs, self.placed_signs)
+        np.copyto(self.previous_band_depths, self.placed_depths)
+
+    def interpolated_positions(self, alpha):
+        """Star positions a fraction alpha of the way through the current tick."""
+        if alpha >= 1.0:
+            return self.positions
+        return interpolate_positions(self.previous_positions, self.positions, alpha)
+
+    def update(self, player_velocity, depth_change, delta_time):
+        """
+        Scroll every band, then bring the arrays in line with the sectors now in view.
+        Per band, depth wraps from one end of the range to the other with the band
+        inverted about the screen center, and parallax moves a band by the player's
+        velocity over its depth.
+        Band state advances every tick, but the stars of far bands are only re-placed
+        on their LOD interval, picking up every tick's motion since the last time.
+        Args:
+            player_velocity (Vector2): The player's velocity.
+            depth_change (float): The change in depth.
+            delta_time (float): The delta time between frames.
+        """
+        # **Depth Adjustment and Wrapping**
+        self.band_depths += depth_change
+        # Wrapping inverts a band about the view center, which flips its stars' sign too
+        wrapped_depth = wrap_depths(self.band_depths, self.band_offsets, (WIDTH, HEIGHT) - 2 * self.camera.offset)
+        self.band_signs[wrapped_depth] *= -1
+
+        # **Parallax Effect Based on Depth**
+        parallax_factor = delta_time / np.maximum(self.band_depths, MIN_DEPTH)
+        self.band_offsets -= np.multiply.outer(parallax_factor, (player_velocity.x, player_velocity.y))
+
+        # **Temporal LOD**
+        self.tick += 1
+        due = self.due_bands()
+        deepened = self.band_depths != self.placed_depths
+        self.placed_depths[due] = self.band_depths[due]
+        self.placed_offsets[due] = self.band_offsets[due]
+        self.placed_signs[due] = self.band_signs[due]
+
+        # **Stream Sectors In and Out**
+        ranges = self.visible_ranges()
+        stale_bands = ()
+        if self.streamer is not None:
+            arrived = self.streamer.collect()
+            stale_bands = {key[0] for key in arrived if key in self.band_missing[key[0]]}
+        rebuilt = self.materialize(ranges, stale_bands)
+        if rebuilt.any():
+            # Rebuilt bands start over from where their stars were at the start of the tick
+            signs, offsets = self.previous_band_signs, self.previous_band_offsets
+            for band, stars in zip(np.flatnonzero(rebuilt).tolist(), self.band_slices(rebuilt)):
+                previous = self.previous_positions[stars]
+                np.multiply(self.plane_positions[stars], signs[band], out=previous)
+                previous += offsets[band]
+            # They are placed from scratch; every other band keeps its LOD schedule
+            due |= rebuilt
+            deepened |= rebuilt
+        if due.any():
+            self.place(due, deepened)
+        self.placed_bands = due
+
+        # **Relative Velocity Calculation**
+        self.player_velocity = np.array((player_velocity.x, player_velocity.y))
+
+        # Queue what's coming last, so the workers run while the frame renders rather than during the update
+        if self.streamer is not None:
+            self.prefetch(ranges, player_velocity)
+
+    def prefetch(self, ranges, player_velocity):
+        """
+        Ask the streamer for the sectors each band is heading into.
+        The view is extrapolated STREAM_LOOKAHEAD seconds along the player's velocity
+        (including any slingshot boost), clamped to STREAM_PREFETCH_SECTORS sectors past
+        the current view so near bands at full boost don't flood the workers.
+        Args:
+            ranges (numpy.ndarray): Current visible ranges, see visible_ranges.
+            player_velocity (Vector2): The player's velocity, boost included.
+        """
+        lookahead = STREAM_LOOKAHEAD / np.maximum(self.band_depths, MIN_DEPTH)
+        future = self.visible_ranges(
+            self.band_offsets - np.multiply.outer(lookahead, (player_velocity.x, player_velocity.y))
+        )
+        reach = STREAM_PREFETCH_SECTORS
+        wanted = ranges.copy()
+        wanted[:, 0::2] = np.maximum(np.minimum(ranges[:, 0::2], future[:, 0::2]), ranges[:, 0::2] - reach)
+        wanted[:, 1::2] = np.minimum(np.maximum(ranges[:, 1::2], future[:, 1::2]), ranges[:, 1::2] + reach)
+
+        changed = np.flatnonzero((wanted != self.prefetch_ranges).any(axis=1))
+        for band in changed.tolist():
+            x_start, x_end, y_start, y_end = wanted[band].tolist()
+            self.streamer.request(
+                (band, sector_x, sector_y)
+                for sector_x in range(x_start, x_end + 1)
+                for sector_y in range(y_start, y_end + 1)
+                if (band, sector_x, sector_y) not in self.sectors
+            )
+        self.prefetch_ranges = wanted
+
+    def radii(self):
+        """Screen radius of every star, scaled by depth."""
+        return np.maximum(1, (self.sizes / self.depths).astype(np.int32))
+
+    def thin(self, indices, fraction):
+        """
+        Keep a fraction of the given stars, the same ones from frame to frame.
+        A star's depth within its band is uniform and fixed, so it picks the subset
+        without storing anything per star, even while the stars move.
+        Args:
+            indices (numpy.ndarray): Star indices to choose from.
+            fraction (float): Share of them to keep.
+        Returns:
+            numpy.ndarray: The kept indices, in their original order.
+        """
+        share = self.depth_offsets[indices] / self.universe.band_widths[self.bands[indices]] + 0.5
+        return indices[share < fraction]
+
+    def on_screen(self, view_positions, radii):
+        """Indices of the stars that touch the screen, given their screen positions."""
+        x = view_positions[:, 0]
+        y = view_positions[:, 1]
+        return np.flatnonzero((x + radii >= 0) & (x - radii < WIDTH) & (y + radii >= 0) & (y - radii < HEIGHT))
+
+
+class BandBlock:
+    """The materialized sectors of one band, concatenated."""
+
+    __slots__ = ("keys", "starts", "offsets", "positions", "depth_offsets", "sizes", "velocities")
+
+    def __init__(self, keys, sectors):
+        counts = np.array([len(sector) for sector in sectors], dtype=np.intp)
+        self.keys = keys
+        self.offsets = np.cumsum(counts) - counts  # Index of each sector's first star within the block
+        self.starts = dict(zip(keys, self.offsets.tolist()))
+        self.positions = np.concatenate([sector.positions for sector in sectors] + [np.zeros((0, 2))])
+        self.depth_offsets = np.concatenate([sector.depth_offsets for sector in sectors] + [np.zeros(0)])
+        self.sizes = np.concatenate([sector.sizes for sector in sectors] + [np.zeros(0, dtype=np.int64)])
+        self.velocities = np.concatenate([sector.velocities for sector in sectors] + [np.zeros((0, 2))])
+
+    def __len__(self):
+        return len(self.depth_offsets)
+
+
+class StarView:
+    """
+    A thin handle onto one star of a StarField.
+    The handle names the star by sector and position within it, so it stays valid
+    while sectors stream in and out around it.
+    """
+
+    __slots__ = ("field", "key", "local")
+
+    def __init__(self, field, index):
+        self.field = field
+        self.key, self.local = field.star_key(index)
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, StarView) and other.field is self.field
+            and other.key == self.key and other.local == self.local
+        )
+
+    def __hash__(self):
+        return hash((id(self.field), self.key, self.local))
+
+    @property
+    def index(self):
+        """Current index in the field's arrays, or None once the star's sector is gone."""
+        return self.field.star_index(self.key, self.local)
+
+    @property
+    def position(self):
+        """Screen position, with the camera applied."""
+        return Vector2(*self.field.camera.point_to_view(self.field.positions[self.index]))
+
+    @property
+    def velocity(self):
+        return Vector2(*self.field.velocities[self.index])
+
+    @property
+    def relative_velocity(self):
+        return Vector2(*(self.field.velocities[self.index] - self.field.player_velocity))
+
+    @property
+    def depth(self):
+        return float(self.field.depths[self.index])
+
+    @property
+    def size(self):
+        return int(self.field.sizes[self.index])
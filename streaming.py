@@ -0,0 +1,64 @@
+import concurrent.futures
+import queue
+
+from constants import STREAM_WORKERS
+
+class SectorStreamer:
+    """
+    Generates sectors on a worker pool so the simulation thread never waits for them.
+    Workers only run Universe.generate, which reads nothing but the universe's fixed
+    parameters. Finished sectors come back through a queue; the main thread drains it
+    in collect() and files them in the universe's cache, so the cache itself is only
+    ever touched from one thread.
+    """
+
+    def __init__(self, universe, workers=STREAM_WORKERS):
+        """
+        Args:
+            universe (Universe): The universe to generate sectors of.
+            workers (int): Number of worker threads.
+        """
+        self.universe = universe
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sectors")
+        self.finished = queue.SimpleQueue()
+        self.pending = set()  # Keys handed to the workers and not collected yet
+
+    def request(self, keys):
+        """Queue generation of every key that isn't cached or in flight already, as one job."""
+        cache = self.universe.cache
+        keys = [key for key in keys if key not in self.pending and key not in cache]
+        if keys:
+            self.pending.update(keys)
+            self.executor.submit(self._generate, keys)
+
+    def _generate(self, keys):
+        # Runs on a worker; each sector is handed over as soon as it's done
+        for key in keys:
+            self.finished.put(self.universe.generate(key))
+
+    def collect(self):
+        """
+        Move finished sectors into the universe's cache.
+        Returns:
+            list of tuple: Keys of the sectors that arrived.
+        """
+        arrived = []
+        while True:
+            try:
+                sector = self.finished.get_nowait()
+            except queue.Empty:
+                return arrived
+            self.pending.discard(sector.key)
+            self.universe.cache.put(sector)
+            arrived.append(sector.key)
+
+    def take(self, key):
+        """A ready sector, or None after requesting it when it isn't ready yet."""
+        sector = self.universe.cache.take(key)
+        if sector is None:
+            self.request((key,))
+        return sector
+
+    def close(self):
+        """Stop the workers, dropping queued work."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,271 @@
+import functools
+
+import numpy as np
+import pygame
+from constants import *
+from spaceship import SpaceshipSprite, get_spaceship_sprite
+from topology import wrap_points, wrap_depths
+from utils import interpolate_positions
+
+# Swarm target meaning the player's ship
+SWARM_TARGET_PLAYER = "player"
+
+# Sprite facing for each 45° sector of a heading, clockwise on screen from +x, as in
+# Player.calculate_direction_to_target
+HEADING_DIRECTIONS = ("right", "down-right", "down", "down-left", "left", "up-left", "up", "up-right")
+# Every facing a ship can show: level, diving deeper (inward) or climbing toward the viewer (outward)
+FACINGS = [
+    name for direction in HEADING_DIRECTIONS
+    for name in (direction, f"{direction}_inward", f"{direction}_outward")
+]
+
+class Swarm:
+    """
+    A flock of NPC ships steering by boids rules: separation, alignment and cohesion,
+    plus seeking a target. Ships fly in screen space like bullets, with depth as a
+    third axis scaled to pixels by SWARM_DEPTH_SCALE, and scroll with the world's
+    parallax like stars.
+    Neighbours are found through a uniform grid of cubic cells over the swarm's
+    bounding box: one bincount pass sums every cell's ships, a separable box filter
+    sums each cell's 3 x 3 x 3 neighbourhood, and every ship reads its own cell and
+    neighbourhood back. An update is O(ships + cells) with no per-pair work, so the
+    steering for thousands of ships is a few array passes.
+    """
+
+    def __init__(self, count, rng, center=(WIDTH / 2, HEIGHT / 2), depth=1.0, target=None,
+                 spread=SWARM_SPAWN_SPREAD, cell_size=SWARM_CELL_SIZE):
+        """
+        Args:
+            count (int): Number of ships.
+            rng (numpy.random.Generator): Source of the starting positions and headings.
+            center (tuple): Screen position the ships start around.
+            depth (float): Depth the ships start around.
+            target: What the swarm chases: SWARM_TARGET_PLAYER, a StarView, or None to roam.
+            spread (float): Standard deviation of the starting positions, in pixels.
+            cell_size (float): Side of a neighbour grid cell in pixels, also the spacing
+                separation keeps between ships.
+        """
+        self.count = count
+        self.target = target
+        self.depth_scale = SWARM_DEPTH_SCALE
+        self.positions = np.asarray(center, dtype=float) + rng.normal(0.0, spread, (count, 2))
+        wrap_points(self.positions)
+        self.previous_positions = self.positions.copy()  # Positions at the start of the tick
+        self.depths = np.clip(
+            depth + rng.normal(0.0, spread / self.depth_scale, count), SWARM_MIN_DEPTH, SWARM_MAX_DEPTH
+        )
+        # Velocities are (x, y, depth) in pixels per second, depth scaled like positions
+        headings = rng.normal(size=(count, 3))
+        headings /= np.maximum(np.linalg.norm(headings, axis=1), 1e-9)[:, None]
+        self.velocities = headings * SWARM_MIN_SPEED
+        self.cell_size = cell_size
+
+    def __len__(self):
+        return self.count
+
+    def store_previous_positions(self):
+        """Remember where the ships are at the start of a simulation tick."""
+        np.copyto(self.previous_positions, self.positions)
+
+    def interpolated_positions(self, alpha):
+        """Ship positions a fraction alpha of the way through the current tick."""
+        if alpha >= 1.0:
+            return self.positions
+        return interpolate_positions(self.previous_positions, self.positions, alpha)
+
+    def neighbourhoods(self, points):
+        """
+        Grid statistics around every ship.
+        Args:
+            points (numpy.ndarray): (3, N) ship positions with depth in pixels.
+        Returns:
+            tuple of numpy.ndarray: (4, N) ship count and summed position of each ship's
+            own cell, and (7, N) ship count, summed position and summed velocity of its
+            3 x 3 x 3 cell neighbourhood.
+        """
+        # Column, row and depth layer of every ship's cell, counted from the bounding box's corner
+        coordinates = np.empty((3, self.count), dtype=np.int32)
+        coordinates[:2] = self.positions.T * (1.0 / self.cell_size)
+        coordinates[2] = (self.depths - SWARM_MIN_DEPTH) * (self.depth_scale / self.cell_size)
+        coordinates -= coordinates.min(axis=1)[:, None]
+        columns, rows, layers = (coordinates.max(axis=1) + 1).tolist()
+        cells = (coordinates[2] * rows + coordinates[1]) * columns + coordinates[0]
+
+        # Single precision halves the box filter's memory traffic; cell sums stay well within it
+        size = layers * rows * columns
+        channels = (None, *points, *self.velocities.T)
+        sums = np.empty((len(channels), size), dtype=np.float32)
+        for channel, weights in enumerate(channels):
+            sums[channel] = np.bincount(cells, weights, minlength=size)
+        boxes = box_sums(sums.reshape(len(channels), layers, rows, columns))
+        return sums[:4].take(cells, axis=1), boxes.reshape(len(channels), size).take(cells, axis=1)
+
+    def steer(self, points, target):
+        """
+        Acceleration of every ship from the boids rules and the target.
+        Args:
+            points (numpy.ndarray): (3, N) ship positions with depth in pixels.
+            target (numpy.ndarray or None): (3,) point to seek, depth in pixels.
+        Returns:
+            numpy.ndarray: (3, N) accelerations in pixels per second squared.
+        """
+        own, boxes = self.neighbourhoods(points)
+        velocities = self.velocities.T
+
+        # Separation: ships sharing a cell push away from their centroid, harder the more they are
+        crowd = own[0]
+        acceleration = (points - own[1:4] / crowd) * ((crowd - 1.0) * SWARM_SEPARATION)
+        # Cohesion toward the neighbourhood's centroid and alignment with its mean velocity
+        neighbours = boxes[0]
+        acceleration += (boxes[1:4] / neighbours - points) * SWARM_COHESION
+        acceleration += (boxes[4:7] / neighbours - velocities) * SWARM_ALIGNMENT
+
+        if target is not None:
+            # Seek with arrival: full speed straight for the target, easing off within SWARM_ARRIVAL_RADIUS
+            offsets = target[:, None] - points
+            distances = np.maximum(lengths(offsets), 1e-9)
+            speeds = np.minimum(distances, SWARM_ARRIVAL_RADIUS) * (SWARM_MAX_SPEED / SWARM_ARRIVAL_RADIUS)
+            offsets *= speeds / distances
+            acceleration += (offsets - velocities) * SWARM_SEEK
+
+        magnitudes = lengths(acceleration)
+        acceleration *= SWARM_MAX_FORCE / np.maximum(magnitudes, SWARM_MAX_FORCE)
+        return acceleration
+
+    def update(self, target, player_velocity, depth_change, delta_time):
+        """
+        Steer, move and wrap every ship in one batched pass.
+        Args:
+            target (tuple or None): (position, depth) the swarm seeks, position on screen.
+            player_velocity (Vector2): The player's velocity, for parallax.
+            depth_change (float): The change in depth applied to the world this tick.
+            delta_time (float): The delta time between frames.
+        """
+        if not self.count:
+            return
+        scale = self.depth_scale
+        points = np.vstack((self.positions.T, self.depths * scale))
+        if target is not None:
+            position, depth = target
+            target = np.array((position[0], position[1], depth * scale))
+
+        # **Steering**
+        velocities = self.velocities
+        velocities += self.steer(points, target).T * delta_time
+        speeds = np.maximum(lengths(velocities.T), 1e-9)
+        velocities *= (np.clip(speeds, SWARM_MIN_SPEED, SWARM_MAX_SPEED) / speeds)[:, None]
+
+        # **Movement**, with depth held within the swarm's range
+        self.positions += velocities[:, :2] * delta_time
+        depths = self.depths + velocities[:, 2] * (delta_time / scale)
+        beyond = (depths < SWARM_MIN_DEPTH) | (depths > SWARM_MAX_DEPTH)
+        velocities[beyond, 2] = 0.0
+        np.clip(depths, SWARM_MIN_DEPTH, SWARM_MAX_DEPTH, out=depths)
+
+        # **Parallax and Wrapping**, following the stars
+        depths += depth_change
+        wrap_depths(depths, self.positions, min_depth=SWARM_MIN_DEPTH, max_depth=SWARM_MAX_DEPTH)
+        self.depths = depths
+        self.positions -= np.multiply.outer(delta_time / depths, (player_velocity[0], player_velocity[1]))
+        wrap_points(self.positions)
+
+    def facings(self):
+        """FACINGS index of every ship, from its velocity."""
+        velocities = self.velocities
+        angles = np.arctan2(velocities[:, 1], velocities[:, 0])
+        headings = np.round(angles * (4 / np.pi)).astype(np.int32) % 8
+        pitches = velocities[:, 2] / np.maximum(lengths(velocities.T), 1e-9)
+        variants = np.where(pitches > SWARM_PITCH, 1, np.where(pitches < -SWARM_PITCH, 2, 0))
+        return headings * 3 + variants
+
+    def sprites(self, positions=None, scale=1.0):
+        """
+        Pick every ship's sprite for a frame: the player's ship in its facing, recolored and shrunk with depth.
+        Args:
+            positions (numpy.ndarray, optional): Positions to draw at instead of the swarm's.
+            scale (float): Render resolution relative to the logical screen.
+        Returns:
+            tuple: Each ship's sprite surface, and (N, 2) top-left corners and sizes in render pixels.
+        """
+        positions = self.positions if positions is None else positions
+        # Sizes snap to steps of 1 / SWARM_SCALE_STEPS, so a handful of cached sprites cover every depth
+        sizes = np.minimum(SWARM_SHIP_SCALE / self.depths, SWARM_MAX_SHIP_SCALE) * scale
+        steps = np.maximum(1, np.round(sizes * SWARM_SCALE_STEPS).astype(np.int32))
+        span = int(steps.max()) + 1
+        keys, ship_sprites = np.unique(self.facings() * span + steps, return_inverse=True)
+        sprites = [swarm_sprite(FACINGS[key // span], key % span / SWARM_SCALE_STEPS) for key in keys.tolist()]
+        offsets = np.array([sprite.offset for sprite in sprites])
+        extents = np.array([(sprite.width, sprite.height) for sprite in sprites])
+
+        surfaces = [sprites[index].surface for index in ship_sprites.tolist()]
+        corners = (positions * scale).astype(np.int32) + offsets[ship_sprites]
+        return surfaces, corners, extents[ship_sprites]
+
+    def submit(self, queue, positions=None, scale=1.0):
+        """
+        Queue every ship, one draw call per render queue depth layer they occupy.
+        Args:
+            queue (RenderQueue): The frame's render queue.
+            positions (numpy.ndarray, optional): Positions to draw at instead of the swarm's.
+            scale (float): Render resolution relative to the logical screen.
+        """
+        if not self.count:
+            return
+        sprites = self.sprites(positions, scale)
+        keys = queue.layer_keys(self.depths)
+        order = np.argsort(keys, kind="stable")
+        starts = np.flatnonzero(np.diff(keys[order], prepend=-1))
+        for indices in np.split(order, starts[1:]):
+            queue.submit(functools.partial(self.draw, indices=indices, sprites=sprites), float(self.depths[indices[0]]))
+
+    def draw(self, target, indices, sprites):
+        """
+        Draw a set of ships.
+        Args:
+            target (RenderBackend): What to draw through.
+            indices (numpy.ndarray): Ships to draw.
+            sprites (tuple): The frame's sprites, as returned by sprites().
+        Returns:
+            pygame.Rect: The area drawn.
+        """
+        surfaces, corners, extents = sprites
+        corners = corners[indices]
+        target.blits(zip([surfaces[index] for index in indices.tolist()], corners.tolist()))
+        low = corners.min(axis=0)
+        high = (corners + extents[indices]).max(axis=0)
+        return pygame.Rect(low.tolist(), (high - low).tolist())
+
+# Colorkeyed copies of the recolored sprites, keyed by (facing, scale)
+_SPRITE_CACHE = {}
+
+def swarm_sprite(facing, scale):
+    """
+    The swarm's sprite for a facing and scale. The pixel art is fully opaque or fully
+    transparent, so a black colorkey with RLE acceleration replaces per-pixel alpha,
+    which blits several times faster.
+    Returns:
+        SpaceshipSprite: The cached sprite.
+    """
+    key = (facing, scale)
+    sprite = _SPRITE_CACHE.get(key)
+    if sprite is None:
+        source = get_spaceship_sprite(facing, scale, SWARM_PALETTE).surface
+        surface = pygame.Surface(source.get_size())
+        surface.blit(source, (0, 0))
+        surface.set_colorkey((0, 0, 0), pygame.RLEACCEL)
+        sprite = _SPRITE_CACHE[key] = SpaceshipSprite(surface)
+    return sprite
+
+def lengths(vectors):
+    """Euclidean length of each column of a (3, N) array."""
+    return np.sqrt(np.einsum("ij,ij->j", vectors, vectors))
+
+def box_sums(grid):
+    """Sum over each cell's 3 x 3 x 3 neighbourhood of a (channels, layers, rows, columns) grid, zero past its edges."""
+    for axis in range(1, 4):
+        head = (slice(None),) * axis
+        sums = grid.copy()
+        sums[head + (slice(1, None),)] += grid[head + (slice(None, -1),)]
+        sums[head + (slice(None, -1),)] += grid[head + (slice(1, None),)]
+        grid = sums
+    return grid
@@ -0,0 +1,192 @@
+import numpy as np
+import pytest
+
+from constants import WIDTH, HEIGHT, MIN_DEPTH, MAX_DEPTH
+from topology import wrap_axis, wrap_axes, wrap_point, wrap_points, wrap_depth, wrap_depths
+
+# Seeded random property tests: every case draws SAMPLES inputs from its own generator
+SAMPLES = 2000
+SEEDS = range(5)
+
+# **Original Wraps**, as written in star.py, bullet.py and player.py before topology.py.
+# Each handles a single crossing per axis.
+
+def star_wrap(x, y):
+    """Star.update's position wrap, including its 0.1 px margin."""
+    if x < 0:
+        x = WIDTH + x
+        y = HEIGHT - y
+    elif x > WIDTH:
+        x = x - WIDTH
+        y = HEIGHT - y
+    if y < 0:
+        y = HEIGHT + y
+        x = WIDTH - x
+    elif y > HEIGHT:
+        y = y - HEIGHT
+        x = WIDTH - x
+    x = max(0.1, min(x, WIDTH - 0.1))
+    y = max(0.1, min(y, HEIGHT - 0.1))
+    return x, y
+
+def bullet_wrap(x, y):
+    """Bullet.update's and Player's position wrap, which are the same."""
+    if x < 0:
+        x += WIDTH
+        y = HEIGHT - y
+    elif x > WIDTH:
+        x -= WIDTH
+        y = HEIGHT - y
+    if y < 0:
+        y += HEIGHT
+        x = WIDTH - x
+    elif y > HEIGHT:
+        y -= HEIGHT
+        x = WIDTH - x
+    return x, y
+
+def star_depth_wrap(depth):
+    """Star.update's depth wrap: the new depth and whether the position is mirrored."""
+    if depth > MAX_DEPTH:
+        return MIN_DEPTH, True
+    if depth < MIN_DEPTH:
+        return MAX_DEPTH, True
+    return depth, False
+
+def stepped_wrap(x, y):
+    """Any number of crossings, one period at a time."""
+    while x < 0 or x > WIDTH:
+        x += WIDTH if x < 0 else -WIDTH
+        y = HEIGHT - y
+    while y < 0 or y > HEIGHT:
+        y += HEIGHT if y < 0 else -HEIGHT
+        x = WIDTH - x
+    return x, y
+
+def single_crossings(rng):
+    """Positions at most one period off screen, with the edges themselves mixed in."""
+    points = rng.uniform((-WIDTH, -HEIGHT), (2 * WIDTH, 2 * HEIGHT), (SAMPLES, 2))
+    edges = rng.choice([-WIDTH + 1e-9, 0.0, WIDTH, 2 * WIDTH - 1e-9], SAMPLES // 4)
+    points[:len(edges), 0] = edges
+    return points
+
+# **Single Crossings Match the Originals**
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_wrap_point_matches_bullet_and_player_wraps(seed):
+    for x, y in single_crossings(np.random.default_rng(seed)).tolist():
+        assert wrap_point(x, y) == bullet_wrap(x, y)
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_wrap_point_with_margin_matches_star_wrap(seed):
+    for x, y in single_crossings(np.random.default_rng(seed)).tolist():
+        assert wrap_point(x, y, margin=0.1) == star_wrap(x, y)
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("margin, original", [(0.0, bullet_wrap), (0.1, star_wrap)])
+def test_wrap_points_matches_originals(seed, margin, original):
+    points = single_crossings(np.random.default_rng(seed))
+    expected = [original(x, y) for x, y in points.tolist()]
+    np.testing.assert_array_equal(wrap_points(points.copy(), margin=margin), expected)
+
+# **Multi-Period Overshoot**
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_overshoot_matches_stepping_one_period_at_a_time(seed):
+    rng = np.random.default_rng(seed)
+    points = rng.uniform((-5 * WIDTH, -5 * HEIGHT), (6 * WIDTH, 6 * HEIGHT), (SAMPLES, 2))
+    expected = np.array([stepped_wrap(x, y) for x, y in points.tolist()])
+    scalar = np.array([wrap_point(x, y) for x, y in points.tolist()])
+    np.testing.assert_allclose(scalar, expected, rtol=0, atol=1e-6)
+    np.testing.assert_allclose(wrap_points(points.copy()), expected, rtol=0, atol=1e-6)
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_wrap_axis_counts_periods(seed):
+    for value in np.random.default_rng(seed).uniform(-10 * WIDTH, 10 * WIDTH, SAMPLES).tolist():
+        wrapped, turns = wrap_axis(value, WIDTH)
+        assert 0 <= wrapped <= WIDTH
+        assert wrapped + turns * WIDTH == pytest.approx(value, abs=1e-6)
+
+# **Scalar and Batched Forms Agree**
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_wrap_axes_matches_wrap_axis(seed):
+    values = np.random.default_rng(seed).uniform(-10 * WIDTH, 10 * WIDTH, SAMPLES)
+    expected = [wrap_axis(value, WIDTH) for value in values.tolist()]
+    wrapped = values.copy()
+    turns = wrap_axes(wrapped, WIDTH)
+    np.testing.assert_array_equal(wrapped, [value for value, _ in expected])
+    np.testing.assert_array_equal(turns, [turn for _, turn in expected])
+
+def test_wrap_axes_reports_nothing_moved():
+    values = np.array([0.0, WIDTH / 2, WIDTH])
+    assert wrap_axes(values, WIDTH) is None
+    np.testing.assert_array_equal(values, [0.0, WIDTH / 2, WIDTH])
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("margin", [0.0, 0.1])
+def test_wrap_points_matches_wrap_point(seed, margin):
+    points = np.random.default_rng(seed).uniform((-5 * WIDTH, -5 * HEIGHT), (6 * WIDTH, 6 * HEIGHT), (SAMPLES, 2))
+    expected = [wrap_point(x, y, margin=margin) for x, y in points.tolist()]
+    np.testing.assert_array_equal(wrap_points(points.copy(), margin=margin), expected)
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_wrap_depths_matches_wrap_depth(seed):
+    rng = np.random.default_rng(seed)
+    depths = rng.uniform(MIN_DEPTH - 0.5, MAX_DEPTH + 0.5, SAMPLES)
+    depths[:4] = (MIN_DEPTH, MAX_DEPTH, np.nextafter(MIN_DEPTH, 0), np.nextafter(MAX_DEPTH, 2))
+    positions = rng.uniform((0, 0), (WIDTH, HEIGHT), (SAMPLES, 2))
+    expected = [wrap_depth(depth) for depth in depths.tolist()]
+
+    wrapped_depths = depths.copy()
+    wrapped_positions = positions.copy()
+    wrapped = wrap_depths(wrapped_depths, wrapped_positions)
+    np.testing.assert_array_equal(wrapped_depths, [depth for depth, _ in expected])
+    np.testing.assert_array_equal(wrapped, [flag for _, flag in expected])
+    mirrored = np.where(wrapped[:, None], (WIDTH, HEIGHT) - positions, positions)
+    np.testing.assert_array_equal(wrapped_positions, mirrored)
+
+# **Depth Mirroring**
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_wrap_depth_matches_star_depth_wrap(seed):
+    for depth in np.random.default_rng(seed).uniform(MIN_DEPTH - 0.5, MAX_DEPTH + 0.5, SAMPLES).tolist():
+        assert wrap_depth(depth) == star_depth_wrap(depth)
+
+def test_wrap_depth_at_the_ends():
+    assert wrap_depth(MIN_DEPTH) == (MIN_DEPTH, False)
+    assert wrap_depth(MAX_DEPTH) == (MAX_DEPTH, False)
+    assert wrap_depth(np.nextafter(MAX_DEPTH, 2)) == (MIN_DEPTH, True)
+    assert wrap_depth(np.nextafter(MIN_DEPTH, 0)) == (MAX_DEPTH, True)
+
+def test_wrap_depths_mirrors_through_a_given_point():
+    depths = np.array([MAX_DEPTH + 0.1, 0.5, MIN_DEPTH - 0.05])
+    positions = np.array([[100.0, 200.0], [300.0, 400.0], [500.0, 600.0]])
+    wrapped = wrap_depths(depths, positions, mirror=(1000.0, 800.0))
+    np.testing.assert_array_equal(wrapped, [True, False, True])
+    np.testing.assert_array_equal(depths, [MIN_DEPTH, 0.5, MAX_DEPTH])
+    np.testing.assert_array_equal(positions, [[900.0, 600.0], [300.0, 400.0], [500.0, 200.0]])
+
+def test_wrap_depths_custom_range_leaves_positions_alone_without_wraps():
+    depths = np.array([0.5, 1.5])
+    positions = np.array([[1.0, 2.0], [3.0, 4.0]])
+    wrapped = wrap_depths(depths, positions, min_depth=0.2, max_depth=2.0)
+    assert not wrapped.any()
+    np.testing.assert_array_equal(positions, [[1.0, 2.0], [3.0, 4.0]])
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_wrap_depths_carry_keeps_the_overshoot(seed):
+    rng = np.random.default_rng(seed)
+    span = MAX_DEPTH - MIN_DEPTH
+    depths = rng.uniform(MIN_DEPTH - span, MAX_DEPTH + span, SAMPLES)
+    positions = rng.uniform((0, 0), (WIDTH, HEIGHT), (SAMPLES, 2))
+    expected = np.where(depths > MAX_DEPTH, depths - span, np.where(depths < MIN_DEPTH, depths + span, depths))
+    outside = (depths > MAX_DEPTH) | (depths < MIN_DEPTH)
+
+    wrapped_depths = depths.copy()
+    wrapped_positions = positions.copy()
+    wrapped = wrap_depths(wrapped_depths, wrapped_positions, carry=True)
+    np.testing.assert_array_equal(wrapped, outside)
+    np.testing.assert_allclose(wrapped_depths, expected, rtol=0, atol=1e-12)
+    assert ((wrapped_depths >= MIN_DEPTH) & (wrapped_depths <= MAX_DEPTH)).all()
+    np.testing.assert_array_equal(wrapped_positions, np.where(outside[:, None], (WIDTH, HEIGHT) - positions, positions))
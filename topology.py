@@ -0,0 +1,147 @@
+import math
+
+import numpy as np
+from constants import WIDTH, HEIGHT, MIN_DEPTH, MAX_DEPTH
+
+# The world wraps like the screen of an old arcade game, except that leaving through one
+# edge also mirrors the other axis: crossing the left or right edge flips y, crossing the
+# top or bottom edge flips x. Depth wraps from one end of its range to the other and
+# mirrors the position through the screen center.
+#
+# An edge crossed more than once within a tick, e.g. at full slingshot boost, counts every
+# crossing: an even number of crossings leaves the other axis unmirrored. A single
+# crossing gives bit-for-bit the same result as the original hand-written wraps.
+
+def wrap_axis(value, period):
+    """
+    Bring a coordinate into [0, period] by whole periods.
+    Returns:
+        tuple: The wrapped value and how many periods it was moved by.
+    """
+    if value > period:
+        turns = math.ceil(value / period) - 1
+    elif value < 0:
+        turns = -math.ceil(-value / period)
+    else:
+        return value, 0
+    value -= turns * period
+    # The division can round across a period boundary; settle it with one more step
+    if value > period:
+        value -= period
+        turns += 1
+    elif value < 0:
+        value += period
+        turns -= 1
+    return value, turns
+
+def wrap_point(x, y, width=WIDTH, height=HEIGHT, margin=0.0):
+    """
+    Apply the inverted toroidal wrap to one position.
+    Args:
+        x (float): Horizontal position.
+        y (float): Vertical position.
+        width (float): Width of the wrapped area.
+        height (float): Height of the wrapped area.
+        margin (float): Keep the result at least this far inside the edges.
+    Returns:
+        tuple: The wrapped (x, y).
+    """
+    x, turns = wrap_axis(x, width)
+    if turns % 2:
+        y = height - y
+    y, turns = wrap_axis(y, height)
+    if turns % 2:
+        x = width - x
+    if margin:
+        x = max(margin, min(x, width - margin))
+        y = max(margin, min(y, height - margin))
+    return x, y
+
+def wrap_depth(depth, min_depth=MIN_DEPTH, max_depth=MAX_DEPTH):
+    """
+    Wrap a depth past either end of its range to the other end.
+    Returns:
+        tuple: The new depth and whether it wrapped, i.e. whether the position has to be mirrored.
+    """
+    if depth > max_depth:
+        return min_depth, True
+    if depth < min_depth:
+        return max_depth, True
+    return depth, False
+
+def wrap_axes(values, period):
+    """
+    Batched wrap_axis: bring an array of coordinates into [0, period] in place.
+    Returns:
+        numpy.ndarray or None: Periods each value was moved by, or None when none moved.
+    """
+    over = values > period
+    under = values < 0
+    if not (over.any() or under.any()):
+        return None
+    turns = np.zeros(len(values))
+    turns[over] = np.ceil(values[over] / period) - 1
+    turns[under] = -np.ceil(-values[under] / period)
+    values -= turns * period
+    over = values > period
+    values[over] -= period
+    turns[over] += 1
+    under = values < 0
+    values[under] += period
+    turns[under] -= 1
+    return turns
+
+def wrap_points(positions, width=WIDTH, height=HEIGHT, margin=0.0):
+    """
+    Batched wrap_point: apply the inverted toroidal wrap to every row of an array in place.
+    Args:
+        positions (numpy.ndarray): (N, 2) float positions.
+        width (float): Width of the wrapped area.
+        height (float): Height of the wrapped area.
+        margin (float): Keep the results at least this far inside the edges.
+    Returns:
+        numpy.ndarray: positions.
+    """
+    x = positions[:, 0]
+    y = positions[:, 1]
+    turns = wrap_axes(x, width)
+    if turns is not None:
+        flip = turns % 2 != 0
+        y[flip] = height - y[flip]
+    turns = wrap_axes(y, height)
+    if turns is not None:
+        flip = turns % 2 != 0
+        x[flip] = width - x[flip]
+    if margin:
+        np.clip(x, margin, width - margin, out=x)
+        np.clip(y, margin, height - margin, out=y)
+    return positions
+
+def wrap_depths(depths, positions=None, mirror=(WIDTH, HEIGHT), min_depth=MIN_DEPTH, max_depth=MAX_DEPTH,
+                carry=False):
+    """
+    Batched wrap_depth, in place, mirroring the positions of whatever wrapped.
+    Args:
+        depths (numpy.ndarray): (N,) depths.
+        positions (numpy.ndarray, optional): (N, 2) positions to mirror along with them.
+        mirror (tuple): Twice the point positions are mirrored through: a wrapped position
+            p becomes mirror - p. The default mirrors through the screen center.
+        min_depth (float): Near end of the depth range.
+        max_depth (float): Far end of the depth range.
+        carry (bool): Carry how far a depth went past one end in from the other end, instead
+            of landing on the other end; for depths at most one range past the ends.
+    Returns:
+        numpy.ndarray: (N,) mask of the depths that wrapped.
+    """
+    too_far = depths > max_depth
+    too_near = depths < min_depth
+    if carry:
+        depths[too_far] -= max_depth - min_depth
+        depths[too_near] += max_depth - min_depth
+    else:
+        depths[too_far] = min_depth
+        depths[too_near] = max_depth
+    wrapped = too_far | too_near
+    if positions is not None and wrapped.any():
+        positions[wrapped] = np.asarray(mirror) - positions[wrapped]
+    return wrapped
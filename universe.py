@@ -0,0 +1,124 @@
+import collections
+import math
+
+import numpy as np
+from constants import WIDTH, HEIGHT, MIN_DEPTH, MAX_DEPTH, SECTOR_SIZE, UNIVERSE_DEPTH_BANDS, SECTOR_CACHE_BYTES
+
+class Sector:
+    """The stars of one sector of one depth band, generated from its key alone."""
+
+    __slots__ = ("key", "positions", "depth_offsets", "sizes", "velocities")
+
+    def __init__(self, key, positions, depth_offsets, sizes, velocities):
+        self.key = key  # (band, sector_x, sector_y)
+        self.positions = positions  # (N, 2) coordinates on the band's plane
+        self.depth_offsets = depth_offsets  # (N,) depth relative to the band's center
+        self.sizes = sizes
+        self.velocities = velocities
+
+    def __len__(self):
+        return len(self.depth_offsets)
+
+    @property
+    def nbytes(self):
+        return self.positions.nbytes + self.depth_offsets.nbytes + self.sizes.nbytes + self.velocities.nbytes
+
+def poisson_cdf(mean):
+    """Cumulative Poisson probabilities up to where the tail is negligible, for inverse-CDF sampling."""
+    if mean <= 0:
+        return np.ones(1)
+    limit = int(mean + 10 * math.sqrt(mean) + 10)
+    log_factorials = np.array([math.lgamma(count + 1) for count in range(limit + 1)])
+    log_pmf = np.arange(limit + 1) * math.log(mean) - mean - log_factorials
+    return np.cumsum(np.exp(log_pmf))
+
+class SectorCache:
+    """Least-recently-used store of generated sectors, capped by memory rather than count."""
+
+    def __init__(self, max_bytes=SECTOR_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.sectors = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self.sectors)
+
+    def __contains__(self, key):
+        return key in self.sectors
+
+    def take(self, key):
+        """Remove and return a cached sector, or None."""
+        sector = self.sectors.pop(key, None)
+        if sector is not None:
+            self.bytes -= sector.nbytes
+        return sector
+
+    def put(self, sector):
+        """Cache a sector that left the active set, dropping the oldest ones past the budget."""
+        self.sectors[sector.key] = sector
+        self.bytes += sector.nbytes
+        while self.bytes > self.max_bytes and self.sectors:
+            _, oldest = self.sectors.popitem(last=False)
+            self.bytes -= oldest.nbytes
+
+class Universe:
+    """
+    An unbounded star field split into depth bands, each tiled into square sectors.
+    A sector's stars depend only on (seed, band, sector_x, sector_y), so sectors can be
+    dropped and rebuilt at will and the same coordinates always hold the same stars.
+    Bands are spaced evenly in parallax (1 / depth) between MIN_DEPTH and MAX_DEPTH.
+    """
+
+    def __init__(self, seed, density, bands=UNIVERSE_DEPTH_BANDS, sector_size=SECTOR_SIZE,
+                 cache_bytes=SECTOR_CACHE_BYTES):
+        """
+        Args:
+            seed (int): World seed.
+            density (int): Average number of stars on screen, summed over all bands.
+            bands (int): Number of depth bands.
+            sector_size (int): Side of a sector in pixels.
+            cache_bytes (int): Memory budget for sectors kept after leaving the view.
+        """
+        self.seed = seed
+        self.density = density
+        self.bands = bands
+        self.sector_size = sector_size
+        self.cache = SectorCache(cache_bytes)
+
+        edges = 1.0 / np.linspace(1.0 / MAX_DEPTH, 1.0 / MIN_DEPTH, bands + 1)
+        self.band_centers = (edges[:-1] + edges[1:]) / 2  # Far bands first
+        self.band_widths = edges[:-1] - edges[1:]
+        self.stars_per_sector = density * sector_size ** 2 / (WIDTH * HEIGHT) / bands
+        self.count_cdf = poisson_cdf(self.stars_per_sector)
+
+    def generate(self, key):
+        """
+        Build a sector from scratch.
+        Args:
+            key (tuple): (band, sector_x, sector_y).
+        Returns:
+            Sector: The sector's stars.
+        """
+        band, sector_x, sector_y = key
+        # SeedSequence takes non-negative entropy, so fold signed coordinates into 64 bits
+        rng = np.random.default_rng((self.seed, band, sector_x % 2 ** 64, sector_y % 2 ** 64))
+        count = int(np.searchsorted(self.count_cdf, rng.random()))
+        # One draw for everything: x, y, depth, size and two velocity components per star
+        draws = rng.random((count, 6))
+        width = self.band_widths[band]
+        return Sector(
+            key,
+            (sector_x * self.sector_size, sector_y * self.sector_size) + draws[:, :2] * self.sector_size,
+            (draws[:, 2] - 0.5) * width,
+            (draws[:, 3] * 3).astype(np.int64) + 1,
+            draws[:, 4:] * 100 - 50,
+        )
+
+    def load(self, key):
+        """A sector from the cache if it is still there, otherwise freshly generated."""
+        sector = self.cache.take(key)
+        return sector if sector is not None else self.generate(key)
+
+    def release(self, sector):
+        """Hand back a sector that is no longer in view."""
+        self.cache.put(sector)
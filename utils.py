@@ -1,3 +1,4 @@
+import numpy as np
 import pygame
 from constants import *
 
@@ -6,10 +7,18 @@ def get_direction(keys_pressed, BASE_DIRECTION_MAP):
     dy = keys_pressed[pygame.K_s] - keys_pressed[pygame.K_w]
     return BASE_DIRECTION_MAP.get((dx, dy)) if (dx, dy) != (0, 0) else None
 
-def wrap_depth(depth):
-    return MIN_DEPTH + (depth - MIN_DEPTH) % (MAX_DEPTH - MIN_DEPTH)
+def interpolate_positions(previous, current, alpha):
+    """
+    Blend two (N, 2) position arrays for rendering between simulation ticks.
+    Entities that wrapped around the screen during the tick snap to their new position.
+    """
+    delta = current - previous
+    wrapped = (np.abs(delta[:, 0]) > WIDTH / 2) | (np.abs(delta[:, 1]) > HEIGHT / 2)
+    blended = previous + delta * alpha
+    blended[wrapped] = current[wrapped]
+    return blended
 
-def draw_box(surface, position, size, color, thickness=2):
+def draw_box(target, position, size, color, thickness=2):
     half_size = size // 2
     quarter_size = size // 4
     x, y = position.x, position.y
@@ -23,5 +32,4 @@ def draw_box(surface, position, size, color, thickness=2):
         ((x + half_size, y + half_size), (x + half_size - quarter_size, y + half_size)),
         ((x + half_size, y + half_size), (x + half_size, y + half_size - quarter_size)),
     ]
-    for start_pos, end_pos in lines:
-        pygame.draw.line(surface, color, start_pos, end_pos, thickness)
+    return target.draw_lines(lines, color, thickness)